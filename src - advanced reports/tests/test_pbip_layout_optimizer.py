@@ -0,0 +1,154 @@
+"""
+Regression tests for the PBIP layout optimizer core
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.pbip_layout_optimizer.enhanced_layout_core import EnhancedPBIPLayoutCore  # noqa: E402
+
+
+# Supplier links Fact_Budget to ProductCategory, which leaves Dim_Product and ProductCategory as
+# L1s with a single L1 neighbour each - the engine promotes both to additional L2s
+TABLES = (
+    'Fact_Sales', 'Fact_Budget', 'Dim_Customer', 'Dim_Geography', 'Dim_Product', 'ProductCategory',
+    'Dim_Store', 'StoreList', 'Calendar', 'Dim_Employee', 'Dim_Channel', 'Supplier', 'SupplierRegion',
+    'Dim_Scenario', 'Dim_Account'
+)
+RELATIONSHIPS = (
+    ('Fact_Sales', 'Dim_Customer'), ('Fact_Sales', 'Dim_Geography'), ('Dim_Customer', 'Dim_Geography'),
+    ('Fact_Sales', 'Dim_Product'), ('Dim_Product', 'ProductCategory'), ('Fact_Sales', 'Dim_Store'),
+    ('Dim_Store', 'StoreList'), ('Fact_Sales', 'Calendar'), ('Fact_Budget', 'Calendar'),
+    ('Fact_Sales', 'Dim_Employee'), ('Fact_Sales', 'Dim_Channel'), ('Dim_Product', 'Supplier'),
+    ('Supplier', 'SupplierRegion'), ('Fact_Budget', 'Dim_Scenario'), ('Fact_Budget', 'Dim_Account'),
+    ('Fact_Budget', 'Supplier'), ('ProductCategory', 'Supplier')
+)
+
+
+def _write_model(root, tables, relationships, one_to_one=()):
+    """Write a minimal PBIP folder; pairs in one_to_one become 1:1 bidirectional relationships"""
+    semantic_model = root / "Model.SemanticModel"
+    tables_path = semantic_model / "definition" / "tables"
+    tables_path.mkdir(parents=True)
+    
+    for table in tables:
+        (tables_path / f"{table}.tmdl").write_text(
+            f"table {table}\n\n    column Key\n        dataType: int64\n", encoding='utf-8')
+    (semantic_model / "definition" / "model.tmdl").write_text("model Model\n", encoding='utf-8')
+    (semantic_model / "definition" / "relationships.tmdl").write_text("\n".join(
+        f"relationship r{i}\n"
+        + ("\tfromCardinality: one\n\tcrossFilteringBehavior: bothDirections\n"
+           if (from_table, to_table) in one_to_one else "\tfromCardinality: many\n")
+        + f"\ttoCardinality: one\n\tfromColumn: {from_table}.Key\n\ttoColumn: {to_table}.Key\n"
+        for i, (from_table, to_table) in enumerate(relationships)), encoding='utf-8')
+    
+    nodes = [{'nodeIndex': table, 'location': {'x': 0, 'y': 0}, 'size': {'width': 200, 'height': 104}, 'zIndex': i}
+             for i, table in enumerate(tables)]
+    (semantic_model / "diagramLayout.json").write_text(
+        json.dumps({'version': '1.1.0', 'diagrams': [{'ordinal': 0, 'name': 'All tables', 'nodes': nodes}]}),
+        encoding='utf-8')
+    return str(root)
+
+
+def _saved_nodes(pbip_folder):
+    """(name, x, y) for every node in the saved diagram layout"""
+    layout = json.loads((Path(pbip_folder) / "Model.SemanticModel" / "diagramLayout.json").read_text(encoding='utf-8'))
+    return [(node['nodeIndex'], node['location']['x'], node['location']['y'])
+            for node in layout['diagrams'][0]['nodes']]
+
+
+@pytest.fixture
+def pbip_folder(tmp_path):
+    """Minimal PBIP folder with tables, relationships and a diagram layout"""
+    return _write_model(tmp_path, TABLES, RELATIONSHIPS)
+
+
+def test_repeated_optimize_keeps_one_node_per_table(pbip_folder):
+    core = EnhancedPBIPLayoutCore()
+    assert core.mcp_available
+    
+    core.analyze_table_categorization(pbip_folder)
+    for _ in range(3):
+        result = core.optimize_layout_with_advanced(pbip_folder, save_changes=False)
+        assert result['success']
+        assert result['tables_arranged'] == len(TABLES)
+
+
+def test_optimize_leaves_categorization_preview_consistent(pbip_folder):
+    core = EnhancedPBIPLayoutCore()
+    
+    result = core.optimize_layout_with_advanced(pbip_folder, save_changes=False)
+    dimensions = result['categorization_preview']['dimension_tables']
+    assert dimensions['l2_count'] == len(dimensions['l2_tables'])
+    
+    again = core.analyze_table_categorization(pbip_folder)['categorization']['dimension_tables']
+    assert again == dimensions
+
+
+def test_cached_categorization_is_not_shared_with_callers(pbip_folder):
+    core = EnhancedPBIPLayoutCore()
+    
+    first = core.analyze_table_categorization(pbip_folder)
+    expected = first['categorization']['dimension_tables']['l2_tables'][:]
+    first['categorization']['dimension_tables']['l2_tables'].append('Injected')
+    
+    second = core.analyze_table_categorization(pbip_folder)
+    assert second['categorization']['dimension_tables']['l2_tables'] == expected
+
+
+def test_repositioned_extension_in_two_dimension_lists_gets_one_node(tmp_path):
+    # Placement leaves Dim_Account in two side lists before its 1:1 partner is repositioned
+    tables = ('d_Property', 'Dim_Employee', 'PortfolioDetail', 'Dim_Vendor', 'Dim_Account')
+    relationships = (('Dim_Vendor', 'Dim_Employee'), ('d_Property', 'PortfolioDetail'),
+                     ('d_Property', 'Dim_Account'), ('Dim_Account', 'Dim_Vendor'))
+    pbip_folder = _write_model(tmp_path, tables, relationships, one_to_one={('Dim_Account', 'Dim_Vendor')})
+    
+    result = EnhancedPBIPLayoutCore().optimize_layout_with_advanced(pbip_folder, save_changes=True)
+    names = [name for name, _, _ in _saved_nodes(pbip_folder)]
+    assert sorted(names) == sorted(tables)
+    assert result['tables_arranged'] == len(tables)
+
+
+def test_additional_l2s_keep_their_layout_columns(tmp_path):
+    # Without Dim_Geography and StoreList the categorizer finds no L2s - Dim_Product and ProductCategory
+    # only become L2s in the engine, and both L2 columns must still be laid out before Dim_Notes
+    drop = {'Dim_Geography', 'StoreList'}
+    tables = tuple(table for table in TABLES if table not in drop) + ('Dim_Notes',)
+    relationships = tuple(pair for pair in RELATIONSHIPS if not drop.intersection(pair))
+    pbip_folder = _write_model(tmp_path, tables, relationships)
+    
+    EnhancedPBIPLayoutCore().optimize_layout_with_advanced(pbip_folder, save_changes=True)
+    positions = {name: (x, y) for name, x, y in _saved_nodes(pbip_folder)}
+    assert positions == {
+        'Dim_Product': (50, 150), 'ProductCategory': (50, 345),
+        'Dim_Account': (400, 150), 'Dim_Channel': (400, 345), 'Dim_Customer': (400, 540), 'Dim_Employee': (400, 735),
+        'Calendar': (750, 150), 'Fact_Budget': (750, 345), 'Fact_Sales': (750, 540), 'Supplier': (750, 735),
+        'Dim_Scenario': (1100, 150), 'Dim_Store': (1100, 345), 'SupplierRegion': (1100, 540),
+        'Dim_Notes': (1750, 50)
+    }
+
+
+def test_hidden_tables_are_found_but_appledouble_files_are_not(pbip_folder):
+    tables_path = Path(pbip_folder) / "Model.SemanticModel" / "definition" / "tables"
+    (tables_path / ".Hidden.tmdl").write_text("table .Hidden\n\n    column Key\n        dataType: int64\n",
+                                              encoding='utf-8')
+    (tables_path / "._Fact_Sales.tmdl").write_bytes(b"\x00\x05\x16\x07")
+    core = EnhancedPBIPLayoutCore(pbip_folder)
+    
+    for table_names in (core.find_tmdl_files(pbip_folder), core._get_table_names_from_tmdl()):
+        assert '.Hidden' in table_names
+        assert '._Fact_Sales' not in table_names
+
+
+def test_saved_layout_matches_json_dump(pbip_folder):
+    # Same bytes with or without orjson installed: escaped non-ASCII and repr-style floats
+    layout = {'version': '1.1.0', 'diagrams': [{'nodes': [{'nodeIndex': 'Café', 'location': {'x': 2.5e-05, 'y': 1e16}}]}]}
+    assert EnhancedPBIPLayoutCore().save_diagram_layout(pbip_folder, layout)
+    
+    saved = Path(pbip_folder) / "Model.SemanticModel" / "diagramLayout.json"
+    assert saved.read_text(encoding='utf-8') == json.dumps(layout, indent=2)
@@ -4,6 +4,7 @@ Built by Reid Havens of Analytic Endeavors
 """
 
 import tkinter as tk
+from operator import itemgetter
 from tkinter import ttk, messagebox
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -35,11 +36,16 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         # State
         self.analysis_results = None
         self.available_pages = []
+        self._help_window = None  # Built once on first open, then hidden/shown
         
         # Setup UI and events
         self.setup_ui()
         self._setup_events()
     
+    def _post_to_ui(self, func, *args) -> None:
+        """Schedule a UI call from a worker thread to run on the Tk main thread"""
+        self.frame.after(0, func, *args)
+    
     def setup_ui(self) -> None:
         """Setup the UI for the advanced page copy tab"""
         # Configure grid weights
@@ -190,8 +196,7 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
             "🔄 This tool duplicates pages within the same report",
             "=" * 60
         ]
-        for msg in messages:
-            self.log_message(msg)
+        self.log_message("\n".join(messages))
     
     def _on_path_change(self):
         """Handle path changes"""
@@ -277,11 +282,10 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         self.pages_listbox.configure(yscrollcommand=scrollbar.set)
         
-        # Populate listbox
+        # Populate listbox with a single insert command
         self.available_pages = pages_with_bookmarks
-        for page in pages_with_bookmarks:
-            display_text = f"{page['display_name']} ({page['bookmark_count']} bookmarks)"
-            self.pages_listbox.insert(tk.END, display_text)
+        self.pages_listbox.insert(tk.END, *(f"{page['display_name']} ({page['bookmark_count']} bookmarks)"
+                                            for page in pages_with_bookmarks))
         
         # Bind selection events
         self.pages_listbox.bind('<<ListboxSelect>>', self._on_page_selection_change)
@@ -391,8 +395,8 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         pages_with_bookmarks = results['pages_with_bookmarks']
         
         if not pages_with_bookmarks:
-            self.log_message("⚠️ No pages with bookmarks found!")
-            self.log_message("   Only pages with bookmarks can be copied with this tool.")
+            self.log_message("⚠️ No pages with bookmarks found!\n"
+                             "   Only pages with bookmarks can be copied with this tool.")
             self.show_warning("No Copyable Pages", 
                              "No pages with bookmarks were found in this report.\n\n"
                              "This tool only copies pages that have associated bookmarks.")
@@ -405,32 +409,36 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         if self.progress_frame and not self.progress_frame.winfo_viewable():
             self._position_progress_frame()
         
-        # Show analysis summary
+        # Show analysis summary - its single log_message call is the one idle-task
+        # flush for this update, so the page list, progress bar and log lay out together
         self._show_analysis_summary(results)
     
     def _show_analysis_summary(self, results):
         """Show analysis summary"""
-        self.log_message("\n📊 ANALYSIS SUMMARY")
-        self.log_message("=" * 50)
-        
         report = results['report']
         copyable_pages = len(results['pages_with_bookmarks'])
         total_pages = results['analysis_summary']['total_pages']
         total_bookmarks = results['analysis_summary']['total_bookmarks']
         
-        self.log_message(f"📄 Report: {report['name']}")
-        self.log_message(f"📄 Total Pages: {total_pages}")
-        self.log_message(f"📋 Pages with Bookmarks: {copyable_pages}")
-        self.log_message(f"🔖 Total Bookmarks: {total_bookmarks}")
+        # Build the whole block and write it with one log call (one Tk insert/scroll)
+        lines = [
+            "\n📊 ANALYSIS SUMMARY",
+            "=" * 50,
+            f"📄 Report: {report['name']}",
+            f"📄 Total Pages: {total_pages}",
+            f"📋 Pages with Bookmarks: {copyable_pages}",
+            f"🔖 Total Bookmarks: {total_bookmarks}"
+        ]
         
         if copyable_pages > 0:
-            self.log_message("\n📋 COPYABLE PAGES:")
-            for page in results['pages_with_bookmarks']:
-                self.log_message(f"   • {page['display_name']} ({page['bookmark_count']} bookmarks)")
-            
-            self.log_message(f"\n✅ Select pages above and click 'EXECUTE COPY' to proceed")
+            lines.append("\n📋 COPYABLE PAGES:")
+            lines.extend(f"   • {page['display_name']} ({page['bookmark_count']} bookmarks)"
+                         for page in results['pages_with_bookmarks'])
+            lines.append(f"\n✅ Select pages above and click 'EXECUTE COPY' to proceed")
         else:
-            self.log_message("\n⚠️ No pages available for copying")
+            lines.append("\n⚠️ No pages available for copying")
+        
+        self.log_message("\n".join(lines))
     
     def start_copy(self):
         """Start copy operation"""
@@ -448,15 +456,19 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
             self.show_error("Error", "Please select at least one page to copy")
             return
         
-        selected_pages = [self.available_pages[i] for i in selected_indices]
+        # itemgetter returns a bare item (not a tuple) for a single index
+        if len(selected_indices) > 1:
+            selected_pages = itemgetter(*selected_indices)(self.available_pages)
+        else:
+            selected_pages = (self.available_pages[selected_indices[0]],)
         page_names = [page['name'] for page in selected_pages]
         
         # Confirm operation
         if not self.ask_yes_no("Confirm Copy", 
                               f"Ready to copy {len(selected_pages)} page(s)?\n\n"
                               f"📋 Pages to copy:\n" + 
-                              "\n".join([f"• {p['display_name']} ({p['bookmark_count']} bookmarks)" 
-                                       for p in selected_pages[:5]]) +
+                              "\n".join(f"• {p['display_name']} ({p['bookmark_count']} bookmarks)" 
+                                        for p in selected_pages[:5]) +
                               (f"\n... and {len(selected_pages)-5} more" if len(selected_pages) > 5 else "") +
                               f"\n\n💾 Report: {Path(self.report_path.get()).name}"):
             return
@@ -469,27 +481,28 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         )
     
     def _copy_thread_target(self, selected_page_names: List[str]):
-        """Background copy logic"""
-        self.log_message("\n🚀 Starting page copy operation...")
+        """Background copy logic - UI updates are scheduled on the main thread"""
+        post = self._post_to_ui
+        post(self.log_message, "\n🚀 Starting page copy operation...")
         
-        self.update_progress(10, "Preparing copy operation...")
+        post(self.update_progress, 10, "Preparing copy operation...")
         report_path = self.clean_file_path(self.report_path.get())
         
-        self.update_progress(30, "Reading report data...")
+        post(self.update_progress, 30, "Reading report data...")
         
         page_count = len(selected_page_names)
         if page_count == 1:
-            self.update_progress(50, f"Copying page with bookmarks...")
+            post(self.update_progress, 50, f"Copying page with bookmarks...")
         else:
-            self.update_progress(50, f"Copying {page_count} pages with bookmarks...")
+            post(self.update_progress, 50, f"Copying {page_count} pages with bookmarks...")
         
         success = self.page_copy_engine.copy_selected_pages(
             report_path, selected_page_names, self.analysis_results
         )
         
-        self.update_progress(90, "Finalizing report updates...")
+        post(self.update_progress, 90, "Finalizing report updates...")
         
-        self.update_progress(100, "Copy operation complete!")
+        post(self.update_progress, 100, "Copy operation complete!")
         return {'success': success, 'report_path': report_path, 'page_count': len(selected_page_names)}
     
     def _handle_copy_complete(self, result):
@@ -531,8 +544,8 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
             self.pages_listbox.config(state=tk.NORMAL)
         self._hide_page_selection_ui()
         
-        # Clear log and show welcome
-        if self.log_text:
+        # Clear log (skip the widget round-trip when it is already empty) and show welcome
+        if self.log_text and self.log_text.index('end-1c') != '1.0':
             self.log_text.config(state=tk.NORMAL)
             self.log_text.delete(1.0, tk.END)
             self.log_text.config(state=tk.DISABLED)
@@ -619,10 +632,18 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
             button_frame.pack(fill=tk.X, pady=(20, 0), side=tk.BOTTOM)
             
             close_button = ttk.Button(button_frame, text="❌ Close", 
-                                    command=help_window.destroy,
+                                    command=self._hide_help_dialog,
                                     style='Action.TButton')
             close_button.pack(pady=(10, 0))
         
+        # Reuse the cached help window if it is still alive
+        if self._help_window is not None and self._help_window.winfo_exists():
+            self._help_window.geometry(f"+{self.main_app.root.winfo_rootx() + 50}+{self.main_app.root.winfo_rooty() + 50}")
+            self._help_window.deiconify()
+            self._help_window.lift()
+            self._help_window.grab_set()
+            return
+        
         # Create custom help window for Advanced Page Copy (independent of base class)
         help_window = tk.Toplevel(self.main_app.root)
         help_window.title("Advanced Page Copy - Help")
@@ -638,5 +659,14 @@ class AdvancedPageCopyTab(BaseToolTab, FileInputMixin, ValidationMixin):
         # Create content
         create_help_content(help_window)
         
-        # Bind escape key
-        help_window.bind('<Escape>', lambda event: help_window.destroy())
+        # Escape and the window close button hide the dialog instead of destroying it
+        help_window.bind('<Escape>', lambda event: self._hide_help_dialog())
+        help_window.protocol("WM_DELETE_WINDOW", self._hide_help_dialog)
+        
+        self._help_window = help_window
+    
+    def _hide_help_dialog(self) -> None:
+        """Hide the cached help window so it can be shown again without rebuilding"""
+        if self._help_window is not None and self._help_window.winfo_exists():
+            self._help_window.grab_release()
+            self._help_window.withdraw()
@@ -5,12 +5,67 @@ Analyzes table connections and builds relationship graphs
 """
 
 import logging
-from typing import Dict, List, Any, Set
+import re
+from typing import Dict, List, Any, Set, FrozenSet
 from pathlib import Path
-from collections import defaultdict, deque
+from collections import deque
+
+try:
+    import ahocorasick  # optional: pyahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger("pbip-tools-mcp")
 
+# Developer switch for the Portfolio-specific extension diagnostics (flip locally when debugging)
+_DEBUG_PORTFOLIO = False
+
+# Universal extension indicators (not domain-specific)
+_EXTENSION_INDICATORS = (
+    'list', 'attribute', 'detail', 'extended', 'profile', 'program', 
+    'portfolio', 'category', 'type', 'option', 'meta', 'extra',
+    'additional', 'supplemental', 'auxiliary', 'secondary', 'properties',
+    'config', 'configuration', 'settings', 'parameters', 'tags',
+    'classifications', 'hierarchy', 'tree', 'node', 'leaf'
+)
+
+# One C-level scan tells us whether a (lowercased) name contains any indicator at all
+_EXTENSION_INDICATOR_RE = re.compile('|'.join(map(re.escape, _EXTENSION_INDICATORS)))
+
+
+# Dimension levels in categorize_tables output order
+_DIMENSION_LEVELS = (
+    (1, 'l1_dimensions'),
+    (2, 'l2_dimensions'),
+    (3, 'l3_dimensions'),
+    (4, 'l4_plus_dimensions')
+)
+
+
+def _build_extension_automaton():
+    """Build an Aho-Corasick automaton over the extension indicators (None without pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for indicator in _EXTENSION_INDICATORS:
+        automaton.add_word(indicator, indicator)
+    automaton.make_automaton()
+    return automaton
+
+
+_EXTENSION_AUTOMATON = _build_extension_automaton()
+
+
+def _extension_indicator_score(name_lower: str) -> int:
+    """Count how many extension indicators appear in a lowercased table name"""
+    if _EXTENSION_AUTOMATON is not None:
+        # Single linear pass reports every (overlapping) match; count distinct indicators
+        return len({indicator for _, indicator in _EXTENSION_AUTOMATON.iter(name_lower)})
+    if not _EXTENSION_INDICATOR_RE.search(name_lower):
+        return 0
+    # Indicators overlap ('config' / 'configuration'), so count each one individually
+    return sum(1 for indicator in _EXTENSION_INDICATORS if indicator in name_lower)
+
 
 class RelationshipAnalyzer:
     """Analyzes relationships between tables in PBIP models"""
@@ -18,6 +73,49 @@ class RelationshipAnalyzer:
     def __init__(self, base_engine):
         self.base_engine = base_engine
         
+        # Table-name set cached per (tables folder, mtime) so repeated graph builds skip the scan
+        self._table_names_key = None
+        self._table_names = frozenset()
+        
+        # Per-table naming scores for extension detection: name -> (indicator score, composite score)
+        self._naming_scores: Dict[str, tuple] = {}
+        
+        # Universal extension detection for the model on disk, cached per model state
+        self._universal_extensions_key = None
+        self._universal_extensions_cache: Dict[str, Dict[str, Any]] = {}
+        
+    def _get_table_name_set(self) -> FrozenSet[str]:
+        """Get all TMDL table names as a frozenset, cached until the tables folder changes"""
+        key = None
+        if self.base_engine.semantic_model_path:
+            tables_dir = self.base_engine.semantic_model_path / "definition" / "tables"
+            try:
+                key = (str(tables_dir), tables_dir.stat().st_mtime_ns)
+            except OSError:
+                key = None
+        
+        if key is None or key != self._table_names_key:
+            self._table_names = frozenset(self.base_engine._get_table_names_from_tmdl())
+            self._table_names_key = key
+        return self._table_names
+        
+    def _extension_cache_key(self):
+        """Key for the cached extension detection: relationships.tmdl and tables folder mtimes"""
+        if not self.base_engine.semantic_model_path:
+            return None
+        definition_path = self.base_engine.semantic_model_path / "definition"
+        try:
+            return (str(definition_path),
+                    (definition_path / "relationships.tmdl").stat().st_mtime_ns,
+                    (definition_path / "tables").stat().st_mtime_ns)
+        except OSError:
+            return None
+            
+    def invalidate_extension_cache(self):
+        """Drop the cached universal extension detection"""
+        self._universal_extensions_key = None
+        self._universal_extensions_cache = {}
+        
     def parse_relationships_from_tmdl(self) -> List[Dict[str, Any]]:
         """Parse relationships from relationships.tmdl file"""
         if not self.base_engine.semantic_model_path:
@@ -32,59 +130,56 @@ class RelationshipAnalyzer:
             
         relationships = []
         try:
-            with open(relationships_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
             logger.info(f"Parsing relationships from {relationships_file}")
             
-            # Parse relationships from TMDL format
-            lines = content.split('\n')
-            in_relationship = False
-            current_rel = {}
-            
-            for line in lines:
-                line = line.strip()
+            with open(relationships_file, 'r', encoding='utf-8') as f:
+                # Parse relationships from TMDL format, streaming line by line
+                in_relationship = False
+                current_rel = {}
+                
+                for line in f:
+                    line = line.strip()
                 
-                if line.startswith('relationship '):
-                    in_relationship = True
-                    rel_name = line.replace('relationship ', '').strip()
-                    current_rel = {'name': rel_name}
+                    if line.startswith('relationship '):
+                        in_relationship = True
+                        rel_name = line.replace('relationship ', '').strip()
+                        current_rel = {'name': rel_name}
                     
-                elif in_relationship and 'fromColumn:' in line:
-                    column_ref = line.split('fromColumn:')[1].strip()
-                    from_table = column_ref.split('.')[0].strip().strip("'").strip('"')
-                    from_table = self.base_engine._normalize_table_name(from_table)
-                    current_rel['fromTable'] = from_table
+                    elif in_relationship and 'fromColumn:' in line:
+                        column_ref = line.partition('fromColumn:')[2].strip()
+                        from_table = column_ref.partition('.')[0].strip().strip("'").strip('"')
+                        from_table = self.base_engine._normalize_table_name(from_table)
+                        current_rel['fromTable'] = from_table
                     
-                elif in_relationship and 'toColumn:' in line:
-                    column_ref = line.split('toColumn:')[1].strip()
-                    to_table = column_ref.split('.')[0].strip().strip("'").strip('"')
-                    to_table = self.base_engine._normalize_table_name(to_table)
-                    current_rel['toTable'] = to_table
+                    elif in_relationship and 'toColumn:' in line:
+                        column_ref = line.partition('toColumn:')[2].strip()
+                        to_table = column_ref.partition('.')[0].strip().strip("'").strip('"')
+                        to_table = self.base_engine._normalize_table_name(to_table)
+                        current_rel['toTable'] = to_table
                     
-                elif in_relationship and 'fromCardinality:' in line:
-                    cardinality = line.split('fromCardinality:')[1].strip()
-                    current_rel['fromCardinality'] = cardinality
+                    elif in_relationship and 'fromCardinality:' in line:
+                        cardinality = line.partition('fromCardinality:')[2].strip()
+                        current_rel['fromCardinality'] = cardinality
                     
-                elif in_relationship and 'toCardinality:' in line:
-                    cardinality = line.split('toCardinality:')[1].strip()
-                    current_rel['toCardinality'] = cardinality
+                    elif in_relationship and 'toCardinality:' in line:
+                        cardinality = line.partition('toCardinality:')[2].strip()
+                        current_rel['toCardinality'] = cardinality
                     
-                elif in_relationship and 'crossFilteringBehavior:' in line:
-                    behavior = line.split('crossFilteringBehavior:')[1].strip()
-                    current_rel['crossFilteringBehavior'] = behavior
+                    elif in_relationship and 'crossFilteringBehavior:' in line:
+                        behavior = line.partition('crossFilteringBehavior:')[2].strip()
+                        current_rel['crossFilteringBehavior'] = behavior
                     
-                elif in_relationship and line == '':
-                    in_relationship = False
-                    if 'fromTable' in current_rel and 'toTable' in current_rel:
-                        relationships.append(current_rel)
-                        logger.debug(f"Found relationship: {current_rel['fromTable']} -> {current_rel['toTable']}")
-                    current_rel = {}
+                    elif in_relationship and line == '':
+                        in_relationship = False
+                        if 'fromTable' in current_rel and 'toTable' in current_rel:
+                            relationships.append(current_rel)
+                            logger.debug(f"Found relationship: {current_rel['fromTable']} -> {current_rel['toTable']}")
+                        current_rel = {}
                     
-            # Handle last relationship if file doesn't end with blank line
-            if in_relationship and current_rel and 'fromTable' in current_rel and 'toTable' in current_rel:
-                relationships.append(current_rel)
-                logger.debug(f"Found relationship: {current_rel['fromTable']} -> {current_rel['toTable']}")
+                # Handle last relationship if file doesn't end with blank line
+                if in_relationship and current_rel and 'fromTable' in current_rel and 'toTable' in current_rel:
+                    relationships.append(current_rel)
+                    logger.debug(f"Found relationship: {current_rel['fromTable']} -> {current_rel['toTable']}")
                 
             logger.info(f"Parsed {len(relationships)} relationships from TMDL")
                     
@@ -95,11 +190,14 @@ class RelationshipAnalyzer:
         
     def build_relationship_graph(self) -> Dict[str, Set[str]]:
         """Build a graph of table connections"""
-        relationships = self.parse_relationships_from_tmdl()
-        connections = defaultdict(set)
+        return self._build_graph_from(self.parse_relationships_from_tmdl())
+        
+    def _build_graph_from(self, relationships: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+        """Build a graph of table connections from already-parsed relationships"""
+        connections: Dict[str, Set[str]] = {}
         
         # Get all table names for validation
-        all_tables = set(self.base_engine._get_table_names_from_tmdl())
+        all_tables = self._get_table_name_set()
         
         for rel in relationships:
             from_table = rel.get('fromTable', '')
@@ -108,18 +206,19 @@ class RelationshipAnalyzer:
             if from_table and to_table:
                 # Validate that both tables exist
                 if from_table in all_tables and to_table in all_tables:
-                    connections[from_table].add(to_table)
-                    connections[to_table].add(from_table)
+                    connections.setdefault(from_table, set()).add(to_table)
+                    connections.setdefault(to_table, set()).add(from_table)
                     logger.debug(f"Added connection: {from_table} <-> {to_table}")
                 else:
                     logger.warning(f"Relationship references unknown table(s): {from_table} -> {to_table}")
         
-        # Log connection counts
-        for table in sorted(all_tables):
-            count = len(connections.get(table, set()))
-            logger.info(f"Table '{table}': {count} connections")
+        # Log connection counts (one record, only when debugging)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Connection counts:\n" + "\n".join(
+                f"  Table '{table}': {len(connections.get(table, ()))} connections"
+                for table in sorted(all_tables)))
         
-        return dict(connections)
+        return connections
         
     def calculate_distance_to_facts(self, table_name: str, connections: Dict[str, Set[str]], fact_tables: Set[str]) -> int:
         """Calculate shortest distance from table to any fact table"""
@@ -145,7 +244,34 @@ class RelationshipAnalyzer:
                     queue.append((connected_table, distance + 1))
                     
         return 999  # No path to facts found
-        
+
+    def calculate_distances_to_facts(self, connections: Dict[str, Set[str]], fact_tables: Set[str]) -> Dict[str, int]:
+        """Shortest distance from every table to any fact table in one multi-source BFS
+
+        Matches calculate_distance_to_facts for each table; tables with no path
+        to a fact are absent (callers default them to 999).
+        """
+        # Walk edges backwards from the facts so directed graphs give the same answer.
+        # A plain queue is kept on purpose: level-synchronous set-union frontiers need the
+        # reverse adjacency as sets, and building those costs more than the BFS they speed up
+        reverse_connections: Dict[str, List[str]] = {}
+        for source_table, connected_tables in connections.items():
+            for connected_table in connected_tables:
+                reverse_connections.setdefault(connected_table, []).append(source_table)
+
+        distances = dict.fromkeys(fact_tables, 0)
+        queue = deque(distances)
+
+        while queue:
+            current_table = queue.popleft()
+            next_distance = distances[current_table] + 1
+            for source_table in reverse_connections.get(current_table, ()):
+                if source_table not in distances:
+                    distances[source_table] = next_distance
+                    queue.append(source_table)
+
+        return distances
+
     def get_downstream_connections(self, table_name: str, connections: Dict[str, Set[str]]) -> Set[str]:
         """Get tables that connect TO this table (downstream in snowflake)"""
         downstream = set()
@@ -161,24 +287,44 @@ class RelationshipAnalyzer:
     def is_star_schema_table(self, table_name: str, connections: Dict[str, Set[str]], fact_tables: Set[str]) -> bool:
         """Check if table is pure star schema (connects to facts, no downstream tables)"""
         upstream = self.get_upstream_connections(table_name, connections)
-        downstream = self.get_downstream_connections(table_name, connections)
         
-        # Must connect to at least one fact table
-        connects_to_fact = bool(upstream.intersection(fact_tables))
-        
-        # Must have no downstream tables
-        has_no_downstream = len(downstream) == 0
-        
-        return connects_to_fact and has_no_downstream
+        # Must connect to at least one fact table (set intersection test in C, stops at the first match)
+        if fact_tables.isdisjoint(upstream):
+            return False
         
-    def identify_extension_tables_universal(self) -> Dict[str, Dict[str, Any]]:
-        """🚀 UNIVERSAL: Generic detection of extension tables across any model"""
-        relationships = self.parse_relationships_from_tmdl()
-        connections = self.build_relationship_graph()
+        # Must have no downstream tables (stop at the first table pointing back here)
+        return not any(table_name in connected_tables and other_table != table_name
+                       for other_table, connected_tables in connections.items())
+        
+    def identify_extension_tables_universal(self, relationships: List[Dict[str, Any]] = None,
+                                            connections: Dict[str, Set[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """🚀 UNIVERSAL: Generic detection of extension tables across any model
+        
+        Callers that already hold the parsed relationships and/or connection graph
+        can pass them in to avoid re-reading relationships.tmdl. Detection for the
+        model on disk (neither relationships nor connections passed) is cached until
+        relationships.tmdl or the tables folder changes, or invalidate_extension_cache() is called.
+        """
+        cache_key = None
+        if relationships is None and connections is None:
+            cache_key = self._extension_cache_key()
+            if cache_key is not None and cache_key == self._universal_extensions_key:
+                logger.debug("🔍 UNIVERSAL EXTENSION DETECTION: reusing cached result")
+                return dict(self._universal_extensions_cache)
+        if relationships is None:
+            relationships = self.parse_relationships_from_tmdl()
+        if connections is None:
+            connections = self._build_graph_from(relationships)
         extensions = {}
         
+        # Evaluate log levels once - the candidate loops below run per relationship
+        log_info = logger.isEnabledFor(logging.INFO)
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        debug_portfolio = _DEBUG_PORTFOLIO and log_debug
+        
         logger.info("🔍 UNIVERSAL EXTENSION DETECTION: Starting comprehensive analysis...")
-        logger.info(f"🔍 DEBUG: Looking specifically for Portfolio relationships...")
+        if debug_portfolio:
+            logger.debug("🔍 DEBUG: Looking specifically for Portfolio relationships...")
         
         # Step 1: Find all 1:1 relationship candidates
         one_to_one_candidates = []
@@ -187,20 +333,27 @@ class RelationshipAnalyzer:
             from_table = rel.get('fromTable', '')
             to_table = rel.get('toTable', '')
             
+            # Read the relationship properties once per iteration
+            cross_filtering = rel.get('crossFilteringBehavior')
+            from_cardinality = rel.get('fromCardinality')
+            to_cardinality = rel.get('toCardinality')
+            
+            # Lowercase names only when the Portfolio diagnostics will actually be emitted
+            is_portfolio_rel = debug_portfolio and ('portfolio' in from_table.lower() or 'portfolio' in to_table.lower())
+            
             # DEBUG: Log all Portfolio relationships
-            if 'portfolio' in from_table.lower() or 'portfolio' in to_table.lower():
-                logger.info(f"🎯 PORTFOLIO RELATIONSHIP FOUND: {from_table} ↔ {to_table}")
-                logger.info(f"   fromCardinality: {rel.get('fromCardinality', 'none')}")
-                logger.info(f"   toCardinality: {rel.get('toCardinality', 'none')}")
-                logger.info(f"   crossFilteringBehavior: {rel.get('crossFilteringBehavior', 'none')}")
+            if is_portfolio_rel:
+                logger.debug(f"🎯 PORTFOLIO RELATIONSHIP FOUND: {from_table} ↔ {to_table}\n"
+                             f"   fromCardinality: {from_cardinality or 'none'}\n"
+                             f"   toCardinality: {to_cardinality or 'none'}\n"
+                             f"   crossFilteringBehavior: {cross_filtering or 'none'}")
             
             if not from_table or not to_table:
                 continue
                 
             # Strong 1:1 indicators
-            is_bidirectional = rel.get('crossFilteringBehavior') == 'bothDirections'
-            has_one_cardinality = (rel.get('fromCardinality') == 'one' or 
-                                  rel.get('toCardinality') == 'one')
+            is_bidirectional = cross_filtering == 'bothDirections'
+            has_one_cardinality = from_cardinality == 'one' or to_cardinality == 'one'
             
             # Universal detection criteria (much more inclusive)
             is_extension_candidate = False
@@ -234,27 +387,34 @@ class RelationshipAnalyzer:
                 })
                 
                 # PORTFOLIO DEBUG: Special logging for Portfolio candidates
-                if 'portfolio' in from_table.lower() or 'portfolio' in to_table.lower():
-                    logger.info(f"🎯 PORTFOLIO EXTENSION CANDIDATE ADDED: {from_table} ↔ {to_table} ")
-                    logger.info(f"   strength={strength}, reasons={detection_reasons}")
-                    logger.info(f"   bidirectional={is_bidirectional}, one_cardinality={has_one_cardinality}")
+                if is_portfolio_rel:
+                    logger.debug(f"🎯 PORTFOLIO EXTENSION CANDIDATE ADDED: {from_table} ↔ {to_table}\n"
+                                 f"   strength={strength}, reasons={detection_reasons}\n"
+                                 f"   bidirectional={is_bidirectional}, one_cardinality={has_one_cardinality}")
                 
-                logger.info(f"🎯 EXTENSION CANDIDATE: {from_table} ↔ {to_table} "
-                           f"(strength={strength}, reasons={detection_reasons})")
+                if log_info:
+                    logger.info(f"🎯 EXTENSION CANDIDATE: {from_table} ↔ {to_table} "
+                               f"(strength={strength}, reasons={detection_reasons})")
         
         logger.info(f"🔍 Found {len(one_to_one_candidates)} extension candidates")
         
-        # PORTFOLIO DEBUG: Check if Portfolio was found in candidates
-        portfolio_candidates = [c for c in one_to_one_candidates 
-                              if 'portfolio' in c['table_a'].lower() or 'portfolio' in c['table_b'].lower()]
-        logger.info(f"🎯 PORTFOLIO CANDIDATES FOUND: {len(portfolio_candidates)}")
-        for candidate in portfolio_candidates:
-            logger.info(f"   📋 Portfolio candidate: {candidate['table_a']} ↔ {candidate['table_b']}")
-        
-        # DEBUG: Print first few candidates for inspection
-        for i, candidate in enumerate(one_to_one_candidates[:5]):
-            logger.info(f"🔍 Candidate {i+1}: {candidate['table_a']} ↔ {candidate['table_b']} "
-                       f"(strength={candidate['strength']}, reasons={candidate['detection_reasons']})")
+        if log_debug:
+            debug_lines = []
+            
+            # PORTFOLIO DEBUG: Check if Portfolio was found in candidates
+            if debug_portfolio:
+                portfolio_candidates = [c for c in one_to_one_candidates 
+                                      if 'portfolio' in c['table_a'].lower() or 'portfolio' in c['table_b'].lower()]
+                debug_lines.append(f"🎯 PORTFOLIO CANDIDATES FOUND: {len(portfolio_candidates)}")
+                debug_lines.extend(f"   📋 Portfolio candidate: {c['table_a']} ↔ {c['table_b']}"
+                                   for c in portfolio_candidates)
+            
+            # DEBUG: Print first few candidates for inspection
+            debug_lines.extend(f"🔍 Candidate {i+1}: {c['table_a']} ↔ {c['table_b']} "
+                               f"(strength={c['strength']}, reasons={c['detection_reasons']})"
+                               for i, c in enumerate(one_to_one_candidates[:5]))
+            if debug_lines:
+                logger.debug("\n".join(debug_lines))
         
         # Step 2: For each 1:1 pair, determine which is the extension
         for candidate in one_to_one_candidates:
@@ -265,13 +425,16 @@ class RelationshipAnalyzer:
             connections_a = len(connections.get(table_a, set()))
             connections_b = len(connections.get(table_b, set()))
             
-            logger.info(f"🔍 ANALYZING PAIR: {table_a} ({connections_a} connections) ↔ {table_b} ({connections_b} connections)")
+            if log_info:
+                logger.info("🔍 ANALYZING PAIR: %s (%d connections) ↔ %s (%d connections)",
+                            table_a, connections_a, table_b, connections_b)
             
             # PORTFOLIO DEBUG: Special attention to Portfolio analysis
-            if 'portfolio' in table_a.lower() or 'portfolio' in table_b.lower():
-                logger.info(f"🎯 PORTFOLIO ANALYSIS: {table_a} ({connections_a} conn) ↔ {table_b} ({connections_b} conn)")
-                logger.info(f"   🔍 Portfolio connections: {connections.get('Portfolio', set())}")
-                logger.info(f"   🔍 Dim_Property connections: {connections.get('Dim_Property', set())}")
+            is_portfolio_pair = debug_portfolio and ('portfolio' in table_a.lower() or 'portfolio' in table_b.lower())
+            if is_portfolio_pair:
+                logger.debug(f"🎯 PORTFOLIO ANALYSIS: {table_a} ({connections_a} conn) ↔ {table_b} ({connections_b} conn)\n"
+                             f"   🔍 Portfolio connections: {connections.get('Portfolio', set())}\n"
+                             f"   🔍 Dim_Property connections: {connections.get('Dim_Property', set())}")
             
             # Determine extension vs base table
             extension_table = None
@@ -295,11 +458,12 @@ class RelationshipAnalyzer:
                 determination_method = "naming_heuristics"
             
             # PORTFOLIO DEBUG: Log Portfolio determination
-            if 'portfolio' in table_a.lower() or 'portfolio' in table_b.lower():
-                logger.info(f"🎯 PORTFOLIO DETERMINATION: extension={extension_table}, base={base_table}, method={determination_method}")
+            if is_portfolio_pair:
+                logger.debug(f"🎯 PORTFOLIO DETERMINATION: extension={extension_table}, base={base_table}, method={determination_method}")
             
             # Step 3: Validate this looks like a real extension
-            logger.info(f"🔍 VALIDATION: About to validate {extension_table} -> {base_table}")
+            if log_info:
+                logger.info("🔍 VALIDATION: About to validate %s -> %s", extension_table, base_table)
             if self._validate_extension_pattern(extension_table, base_table, connections):
                 extensions[extension_table] = {
                     'base_table': base_table,
@@ -313,113 +477,110 @@ class RelationshipAnalyzer:
                 }
                 
                 # PORTFOLIO DEBUG: Special logging for Portfolio extensions
-                if extension_table == 'Portfolio' or base_table == 'Portfolio':
-                    logger.info(f"🎯 PORTFOLIO EXTENSION DETECTED! {extension_table} extends {base_table}")
-                    logger.info(f"   📋 Extension info: {extensions[extension_table]}")
+                if debug_portfolio and (extension_table == 'Portfolio' or base_table == 'Portfolio'):
+                    logger.debug(f"🎯 PORTFOLIO EXTENSION DETECTED! {extension_table} extends {base_table}\n"
+                                 f"   📋 Extension info: {extensions[extension_table]}")
                 
-                logger.info(f"✅ UNIVERSAL EXTENSION CONFIRMED: {extension_table} extends {base_table} "
-                           f"(method={determination_method}, confidence={candidate['strength']})")
+                if log_info:
+                    logger.info("✅ UNIVERSAL EXTENSION CONFIRMED: %s extends %s (method=%s, confidence=%s)",
+                                extension_table, base_table, determination_method, candidate['strength'])
             else:
                 # PORTFOLIO DEBUG: Log Portfolio validation failures
-                if 'portfolio' in table_a.lower() or 'portfolio' in table_b.lower():
-                    logger.info(f"🎯 PORTFOLIO VALIDATION FAILED: {extension_table} -> {base_table}")
-                logger.info(f"❌ EXTENSION REJECTED: {extension_table} -> {base_table} (failed validation)")
-        
-        logger.info(f"🎯 FINAL UNIVERSAL EXTENSIONS DETECTED: {len(extensions)}")
-        for ext_table, ext_info in extensions.items():
-            logger.info(f"   📋 {ext_table} extends {ext_info['base_table']} "
-                       f"(confidence={ext_info['confidence']}, method={ext_info['determination_method']})")
+                if is_portfolio_pair:
+                    logger.debug(f"🎯 PORTFOLIO VALIDATION FAILED: {extension_table} -> {base_table}")
+                if log_info:
+                    logger.info("❌ EXTENSION REJECTED: %s -> %s (failed validation)",
+                                extension_table, base_table)
+        
+        if log_info:
+            summary_lines = [f"🎯 FINAL UNIVERSAL EXTENSIONS DETECTED: {len(extensions)}"]
+            summary_lines.extend(f"   📋 {ext_table} extends {ext_info['base_table']} "
+                                 f"(confidence={ext_info['confidence']}, method={ext_info['determination_method']})"
+                                 for ext_table, ext_info in extensions.items())
+            logger.info("\n".join(summary_lines))
         
         # PORTFOLIO DEBUG: Final check for Portfolio in extensions
-        if 'Portfolio' in extensions:
-            logger.info(f"🎯 PORTFOLIO FINAL RESULT: Portfolio detected as extension of {extensions['Portfolio']['base_table']}")
-        else:
-            logger.info(f"🎯 PORTFOLIO FINAL RESULT: Portfolio NOT detected as extension")
+        if debug_portfolio:
+            if 'Portfolio' in extensions:
+                logger.debug(f"🎯 PORTFOLIO FINAL RESULT: Portfolio detected as extension of {extensions['Portfolio']['base_table']}")
+            else:
+                logger.debug("🎯 PORTFOLIO FINAL RESULT: Portfolio NOT detected as extension")
         
+        if cache_key is not None:
+            self._universal_extensions_key = cache_key
+            self._universal_extensions_cache = extensions
+            return dict(extensions)
         return extensions
 
+    def _get_naming_scores(self, table_name: str) -> tuple:
+        """Get (indicator score, composite score) for a table name, computed once per table"""
+        scores = self._naming_scores.get(table_name)
+        if scores is None:
+            # Count extension indicators in the table name
+            score = _extension_indicator_score(table_name.lower())
+            
+            # Additional heuristics: tables with underscores often indicate more
+            # specific/detailed tables, and longer names often indicate extensions
+            total_score = score + (table_name.count('_') * 0.5) + (len(table_name) * 0.01)
+            
+            scores = self._naming_scores[table_name] = (score, total_score)
+        return scores
+        
     def _determine_extension_by_universal_naming(self, table_a: str, table_b: str) -> tuple:
         """🌐 UNIVERSAL: Generic naming heuristics to identify likely extension table"""
+        log_info = logger.isEnabledFor(logging.INFO)
+        
+        # Indicator and composite scores, cached per table across candidate pairs
+        a_score, a_total_score = self._get_naming_scores(table_a)
+        b_score, b_total_score = self._get_naming_scores(table_b)
         
-        # Universal extension indicators (not domain-specific)
-        extension_indicators = [
-            'list', 'attribute', 'detail', 'extended', 'profile', 'program', 
-            'portfolio', 'category', 'type', 'option', 'meta', 'extra',
-            'additional', 'supplemental', 'auxiliary', 'secondary', 'properties',
-            'config', 'configuration', 'settings', 'parameters', 'tags',
-            'classifications', 'hierarchy', 'tree', 'node', 'leaf'
-        ]
-        
-        # Convert to lowercase for analysis
-        a_lower = table_a.lower()
-        b_lower = table_b.lower()
-        
-        # Count extension indicators in each table name
-        a_score = sum(1 for indicator in extension_indicators if indicator in a_lower)
-        b_score = sum(1 for indicator in extension_indicators if indicator in b_lower)
-        
-        logger.info(f"🔍 NAMING ANALYSIS: {table_a} score={a_score}, {table_b} score={b_score}")
-        
-        # Additional heuristics
-        # Tables with underscores often indicate more specific/detailed tables
-        a_underscore_count = table_a.count('_')
-        b_underscore_count = table_b.count('_')
-        
-        # Tables with longer names often indicate extensions
-        a_length = len(table_a)
-        b_length = len(table_b)
-        
-        # Composite scoring
-        a_total_score = a_score + (a_underscore_count * 0.5) + (a_length * 0.01)
-        b_total_score = b_score + (b_underscore_count * 0.5) + (b_length * 0.01)
-        
-        if a_total_score > b_total_score:
-            logger.info(f"🎯 NAMING DECISION: {table_a} is extension (score={a_total_score:.2f} > {b_total_score:.2f})")
-            return table_a, table_b  # A is extension
-        elif b_total_score > a_total_score:
-            logger.info(f"🎯 NAMING DECISION: {table_b} is extension (score={b_total_score:.2f} > {a_total_score:.2f})")
-            return table_b, table_a  # B is extension
-        else:
-            # Final fallback: alphabetical (consistent but arbitrary)
-            if table_a > table_b:  # Later alphabetically = extension
-                logger.info(f"🎯 NAMING DECISION: {table_a} is extension (alphabetical fallback)")
-                return table_a, table_b
+        if log_info:
+            logger.info("🔍 NAMING ANALYSIS: %s score=%d, %s score=%d", table_a, a_score, table_b, b_score)
+        
+        # Higher composite score is the extension; on a tie fall back to alphabetical
+        # (consistent but arbitrary - later alphabetically = extension)
+        score_delta = a_total_score - b_total_score
+        a_is_extension = score_delta > 0 or (score_delta == 0 and table_a > table_b)
+        extension_table, base_table = (table_a, table_b) if a_is_extension else (table_b, table_a)
+        
+        if log_info:
+            if score_delta:
+                logger.info("🎯 NAMING DECISION: %s is extension (score=%.2f > %.2f)",
+                            extension_table, max(a_total_score, b_total_score), min(a_total_score, b_total_score))
             else:
-                logger.info(f"🎯 NAMING DECISION: {table_b} is extension (alphabetical fallback)")
-                return table_b, table_a
+                logger.info("🎯 NAMING DECISION: %s is extension (alphabetical fallback)", extension_table)
+        
+        return extension_table, base_table
 
     def _validate_extension_pattern(self, extension_table: str, base_table: str, 
                                    connections: Dict[str, Set[str]]) -> bool:
         """🛡️ UNIVERSAL: Validate that this looks like a real extension relationship"""
         
         # Extension table should have very few connections (1-4 typically for real extensions)
-        ext_connections = len(connections.get(extension_table, set()))
-        base_connections = len(connections.get(base_table, set()))
-        
-        logger.info(f"🛡️ VALIDATING: {extension_table} ({ext_connections} conn) extends {base_table} ({base_connections} conn)")
-        
-        # Rule 1: Extension should have fewer or equal connections than base
-        if ext_connections > base_connections:
-            logger.info(f"❌ VALIDATION FAILED: Extension has more connections than base")
-            return False
-        
-        # Rule 2: Extension should connect to the base
-        if extension_table not in connections.get(base_table, set()):
-            logger.info(f"❌ VALIDATION FAILED: Extension doesn't connect to base")
-            return False
-        
-        # Rule 3: Extension shouldn't have too many connections (reasonable limit)
-        if ext_connections > 6:  # Extensions rarely have many connections
-            logger.info(f"❌ VALIDATION FAILED: Extension has too many connections ({ext_connections})")
-            return False
-        
-        # Rule 4: Base should have at least 1 connection
-        if base_connections == 0:
-            logger.info(f"❌ VALIDATION FAILED: Base table has no connections")
-            return False
+        ext_connections = len(connections.get(extension_table, ()))
+        base_connected_tables = connections.get(base_table, ())
+        base_connections = len(base_connected_tables)
+        
+        is_valid = (ext_connections <= base_connections and          # Rule 1: fewer or equal connections than base
+                    extension_table in base_connected_tables and     # Rule 2: extension connects to the base
+                    ext_connections <= 6 and                         # Rule 3: extensions rarely have many connections
+                    base_connections > 0)                            # Rule 4: base has at least 1 connection
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🛡️ VALIDATING: %s (%d conn) extends %s (%d conn)",
+                        extension_table, ext_connections, base_table, base_connections)
+            if is_valid:
+                logger.info("✅ VALIDATION PASSED: Extension pattern confirmed")
+            elif ext_connections > base_connections:
+                logger.info("❌ VALIDATION FAILED: Extension has more connections than base")
+            elif extension_table not in base_connected_tables:
+                logger.info("❌ VALIDATION FAILED: Extension doesn't connect to base")
+            elif ext_connections > 6:
+                logger.info("❌ VALIDATION FAILED: Extension has too many connections (%d)", ext_connections)
+            else:
+                logger.info("❌ VALIDATION FAILED: Base table has no connections")
         
-        logger.info(f"✅ VALIDATION PASSED: Extension pattern confirmed")
-        return True
+        return is_valid
 
     def identify_one_to_one_relationships(self) -> Dict[str, str]:
         """Legacy method - now calls universal detection for backward compatibility"""
@@ -437,42 +598,34 @@ class RelationshipAnalyzer:
         
     def find_dimension_extensions(self, connections: Dict[str, Set[str]], categorized_tables: Dict[str, List[str]]) -> Dict[str, tuple]:
         """🚀 UNIVERSAL: Find dimension extension relationships using enhanced detection"""
+        log_info = logger.isEnabledFor(logging.INFO)
         
-        # Use the new universal detection method
-        universal_extensions = self.identify_extension_tables_universal()
+        # Use the new universal detection method (reusing the caller's graph)
+        universal_extensions = self.identify_extension_tables_universal(connections=connections)
         dimension_extensions = {}
         
-        # Get all dimension tables by level
-        all_dimensions = (
-            categorized_tables.get('l1_dimensions', []) +
-            categorized_tables.get('l2_dimensions', []) +
-            categorized_tables.get('l3_dimensions', []) +
-            categorized_tables.get('l4_plus_dimensions', [])
-        )
-        
-        # Create level mapping for each table
-        level_mapping = {}
-        for table in categorized_tables.get('l1_dimensions', []):
-            level_mapping[table] = 1
-        for table in categorized_tables.get('l2_dimensions', []):
-            level_mapping[table] = 2
-        for table in categorized_tables.get('l3_dimensions', []):
-            level_mapping[table] = 3
-        for table in categorized_tables.get('l4_plus_dimensions', []):
-            level_mapping[table] = 4
+        # Create level mapping for each dimension table
+        level_mapping = {table: level
+                         for level, category in _DIMENSION_LEVELS
+                         for table in categorized_tables.get(category, ())}
+        
+        # All dimension tables (a keys view - constant-time membership checks)
+        all_dimensions = level_mapping.keys()
         
         # Process universal extensions that involve dimension tables
         logger.info(f"🔍 DEBUG: Starting extension processing for dimension tables...")
-        logger.info(f"🔍 all_dimensions includes: {all_dimensions}")
-        logger.info(f"🔍 Portfolio in all_dimensions: {'Portfolio' in all_dimensions}")
-        logger.info(f"🔍 Dim_Property in all_dimensions: {'Dim_Property' in all_dimensions}")
+        logger.info(f"🔍 all_dimensions includes: {list(all_dimensions)}")
+        if _DEBUG_PORTFOLIO:
+            logger.debug(f"🔍 Portfolio in all_dimensions: {'Portfolio' in all_dimensions}")
+            logger.debug(f"🔍 Dim_Property in all_dimensions: {'Dim_Property' in all_dimensions}")
         
         for extension_table, extension_info in universal_extensions.items():
             base_table = extension_info['base_table']
             
-            logger.info(f"🔍 PROCESSING EXTENSION: {extension_table} -> {base_table}")
-            logger.info(f"   extension_table in all_dimensions: {extension_table in all_dimensions}")
-            logger.info(f"   base_table in all_dimensions: {base_table in all_dimensions}")
+            if log_info:
+                logger.info(f"🔍 PROCESSING EXTENSION: {extension_table} -> {base_table}")
+                logger.info(f"   extension_table in all_dimensions: {extension_table in all_dimensions}")
+                logger.info(f"   base_table in all_dimensions: {base_table in all_dimensions}")
             
             # Only process if both tables are dimensions
             if extension_table in all_dimensions and base_table in all_dimensions:
@@ -489,7 +642,8 @@ class RelationshipAnalyzer:
                     extension_info['detection_method']
                 )
                 
-                logger.info(f"🎯 DIMENSION EXTENSION CONFIRMED: {extension_table} (L{extension_level}) "
-                           f"extends {base_table} (L{base_level}) - confidence={extension_info['confidence']}")
+                if log_info:
+                    logger.info(f"🎯 DIMENSION EXTENSION CONFIRMED: {extension_table} (L{extension_level}) "
+                               f"extends {base_table} (L{base_level}) - confidence={extension_info['confidence']}")
                 
         return dimension_extensions
@@ -5,348 +5,489 @@ Dynamically categorizes tables into facts, dimensions, calendar, etc.
 NO HARDCODED TABLE NAMES OR MODEL-SPECIFIC LOGIC
 """
 
+import heapq
 import logging
-from typing import Dict, List, Set, Any
+import re
+import sys
+from collections import Counter
+from typing import Dict, List, Set, Any, Optional, FrozenSet
 from pathlib import Path
 
 logger = logging.getLogger("pbip-tools-mcp")
 
 
+def _indicator_re(indicators) -> re.Pattern:
+    """Compile substring indicators into one alternation (a single C-level scan per name)"""
+    return re.compile('|'.join(map(re.escape, indicators)))
+
+
+# Universal calendar indicators (shared by table scoring and Phase 3 calendar detection)
+_CALENDAR_RE = _indicator_re(('calendar', 'date', 'time', 'period'))
+
+# Universal time/period indicators (language-agnostic patterns)
+_TIME_PERIOD_RE = _indicator_re((
+    'period', 'time', 'date', 'calendar', 'fiscal', 'quarter', 'month', 'year',
+    'cycle', 'season', 'week', 'day', 'hour', 'minute', 'interval',
+    'duration', 'span', 'range', 'tempo', 'zeit', 'temps', 'hora'  # Multi-language support
+))
+
+# Universal parameter indicators
+_PARAMETER_RE = _indicator_re((
+    'param', 'parameter', 'config', 'setting', 'option', 'preference',
+    'variable', 'constant', 'lookup', 'reference', 'master',
+    'código', 'parametro', 'configuración'  # Multi-language support
+))
+
+# Universal disconnected table indicators
+_DISCONNECTED_RE = _indicator_re((
+    'parameter', 'config', 'setting', 'lookup', 'reference', 'master',
+    'static', 'constant', 'readonly', 'system'
+))
+
+# Traditional metrics table keywords
+_METRICS_RE = _indicator_re(('metric', 'measure', 'kpi', 'score'))
+
+# Strong fact patterns (universal)
+_STRONG_FACT_RE = _indicator_re(('fact_', '_fact', 'fact ', ' fact'))
+
+# Universal fact indicators (cross-industry patterns)
+_FACT_RE = _indicator_re((
+    'fact', 'trans', 'event', 'activity', 'record', 'log', 'history',
+    'operation', 'process', 'action', 'movement', 'entry', 'line',
+    'detail', 'item', 'occurrence', 'instance', 'measure'
+))
+
+# Universal dimension indicators
+_DIM_RE = _indicator_re((
+    'dim', 'dimension', 'master', 'lookup', 'reference', 'category',
+    'type', 'class', 'group', 'entity', 'object', 'subject'
+))
+
+# Universal dimension prefixes (str.startswith takes the whole tuple in one call)
+_DIM_PREFIXES = ('d_', 'dim_', 'dim-', 'dim ', 'master_', 'ref_', 'lookup_')
+_EXPLICIT_DIM_PREFIXES = ('dim_', 'dim-', 'dim ', 'd_')
+
+# Shared read-only default for tables missing from the connection graph (no set() per lookup)
+_EMPTY = frozenset()
+
+# Connection-based score by connection count (index capped at 5+)
+_CONNECTION_SCORES = (-5, -3, 5, 10, 10, 15)
+
+# Naming patterns for Power BI auto date/time tables
+_AUTO_DATE_PREFIXES = ('datetabletemplate_', 'localdatetable_')
+
+# TMDL markers, matched against the raw file bytes
+_AUTO_DATE_PATTERNS = (
+    b'__PBI_TemplateDateTable = true',
+    b'__PBI_LocalDateTable = true',
+    b'showAsVariationsOnly',  # Often found in auto date tables
+)
+_PARAMETER_PATTERNS = (
+    b'extendedProperty ParameterMetadata',
+    b'isHidden = true',
+    b'type = Parameter'
+)
+_SPECIAL_PATTERNS = (
+    b'extendedProperty ParameterMetadata',
+    b'calculationGroup',
+    b'isHidden = true'
+)
+_MEASURE_PATTERNS = (b'lineageTag:', b'formatString:')
+
+# Every literal TMDL marker any detector looks for, scanned once per file
+_TMDL_MARKERS = tuple(dict.fromkeys(
+    _AUTO_DATE_PATTERNS + _PARAMETER_PATTERNS + _SPECIAL_PATTERNS + _MEASURE_PATTERNS +
+    (b'isHidden', b"'Date Hierarchy'", b'"Date Hierarchy"', b'Calendar(', b'measure ')
+))
+
+# One pass over a TMDL file: column definition lines, or any other line carrying an expression
+_COLUMN_LINE_RE = re.compile(
+    rb'^[^\S\n]*(?:(?P<column>column [^\n]*)|(?P<expression>[^\n]*?expression(?: =|:)))', re.MULTILINE)
+
+
+def _column_kind(match: re.Match, content: bytes) -> str:
+    """Classify a _COLUMN_LINE_RE match as 'column_plain', 'column_expr' or 'expression'"""
+    if match.lastgroup == 'expression':
+        # An expression line indicates a calculated column
+        return 'expression'
+    column_line = match.group('column')
+    if b'dataType:' in column_line or b'type:' in column_line:
+        # Look ahead for calculated column indicators
+        start = match.start('column')
+        if content.find(b'expression:', start, start + 200) != -1:
+            return 'column_expr'
+    return 'column_plain'
+
+
+def _count_columns(content: bytes) -> tuple:
+    """Count (regular, calculated) columns in raw TMDL content"""
+    kinds = Counter(_column_kind(match, content) for match in _COLUMN_LINE_RE.finditer(content))
+    return kinds['column_plain'], kinds['column_expr'] + kinds['expression']
+
+
 class TableCategorizer:
     """Universal table categorizer based on patterns and relationships only"""
     
     def __init__(self, base_engine, relationship_analyzer):
         self.base_engine = base_engine
         self.relationship_analyzer = relationship_analyzer
+        
+        # Name-only results, computed once per table and shared across categorizer passes
+        self._lower_cache: Dict[str, str] = {}
+        self._calendar_name_cache: Dict[str, bool] = {}
+        self._naming_scores: Dict[str, tuple] = {}
+        
+        # Raw TMDL content per table, read once and shared by every detector
+        self._tmdl_bytes_cache: Dict[str, Optional[bytes]] = {}
+        
+        # Literal TMDL markers found per table, derived once from the raw content
+        self._tmdl_markers_cache: Dict[str, FrozenSet[bytes]] = {}
+        
+        # (is parameter, is special disconnected) per table, shared by Phase 1 and the identify_* wrappers
+        self._special_flags_cache: Dict[str, tuple] = {}
+        
+        # TMDL file map, located only once a detector actually needs file content
+        self._tmdl_files: Optional[Dict[str, Path]] = None
+    
+    def lower_name(self, table_name: str) -> str:
+        """Get the lowercased table name, cached per categorizer"""
+        name_lower = self._lower_cache.get(table_name)
+        if name_lower is None:
+            # str.lower() already takes an ASCII fast path; an encode/translate/decode
+            # round trip is slower for typical table names, so keep it plain
+            name_lower = self._lower_cache[table_name] = table_name.lower()
+        return name_lower
+    
+    def _prime_lower_cache(self, table_names: List[str]):
+        """Lowercase every table name in one C-level map() sweep before the categorizer passes"""
+        missing = [name for name in table_names if name not in self._lower_cache]
+        self._lower_cache.update(zip(missing, map(str.lower, missing)))
+    
+    def _is_calendar_name(self, table_name: str) -> bool:
+        """Check the universal calendar naming pattern, cached per categorizer"""
+        is_calendar = self._calendar_name_cache.get(table_name)
+        if is_calendar is None:
+            is_calendar = self._calendar_name_cache[table_name] = _CALENDAR_RE.search(self.lower_name(table_name)) is not None
+        return is_calendar
+    
+    def _tmdl_bytes(self, table_name: str) -> Optional[bytes]:
+        """Get a table's TMDL file content as bytes, read at most once per categorizer"""
+        if table_name in self._tmdl_bytes_cache:
+            return self._tmdl_bytes_cache[table_name]
+            
+        if self._tmdl_files is None:
+            self._tmdl_files = self.base_engine._find_tmdl_files()
+            
+        content = None
+        tmdl_file = self._tmdl_files.get(table_name)
+        if tmdl_file:
+            try:
+                content = tmdl_file.read_bytes()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not read TMDL file for {table_name}: {e}")
+                
+        self._tmdl_bytes_cache[table_name] = content
+        return content
+    
+    def _tmdl_markers(self, table_name: str) -> FrozenSet[bytes]:
+        """Get the set of _TMDL_MARKERS present in a table's TMDL file (empty if unreadable)"""
+        markers = self._tmdl_markers_cache.get(table_name)
+        if markers is None:
+            content = self._tmdl_bytes(table_name)
+            markers = frozenset(marker for marker in _TMDL_MARKERS if marker in content) if content else frozenset()
+            self._tmdl_markers_cache[table_name] = markers
+        return markers
     
     def identify_auto_date_tables(self, table_names: List[str]) -> List[str]:
         """UNIVERSAL: Identify Power BI auto date/time tables that should be excluded from layout"""
+        log_info = logger.isEnabledFor(logging.INFO)
         auto_date_tables = []
-        tmdl_files = self.base_engine._find_tmdl_files()
         
         for table_name in table_names:
-            name_lower = table_name.lower()
+            name_lower = self.lower_name(table_name)
             
             # Check naming patterns for auto date tables
-            if (name_lower.startswith('datetabletemplate_') or 
-                name_lower.startswith('localdatetable_')):
+            if name_lower.startswith(_AUTO_DATE_PREFIXES):
                 auto_date_tables.append(table_name)
-                logger.info(f"AUTO DATE TABLE BY NAME: '{table_name}'")
+                if log_info:
+                    logger.info(f"AUTO DATE TABLE BY NAME: '{table_name}'")
                 continue
                 
             # Check TMDL content for auto date table markers
-            tmdl_file = tmdl_files.get(table_name)
-            if tmdl_file and tmdl_file.exists():
-                try:
-                    content = tmdl_file.read_text(encoding='utf-8')
-                    
-                    # Check for Power BI auto date table annotations
-                    auto_date_patterns = [
-                        '__PBI_TemplateDateTable = true',
-                        '__PBI_LocalDateTable = true',
-                        'showAsVariationsOnly',  # Often found in auto date tables
-                    ]
-                    
-                    # Also check if table is hidden AND has date hierarchy pattern
-                    is_hidden = 'isHidden' in content
-                    has_date_hierarchy = "'Date Hierarchy'" in content or '"Date Hierarchy"' in content
-                    has_calendar_source = 'Calendar(' in content
-                    
-                    # Auto date table if has annotations OR is hidden date table with hierarchy
-                    if (any(pattern in content for pattern in auto_date_patterns) or
-                        (is_hidden and has_date_hierarchy and has_calendar_source)):
-                        auto_date_tables.append(table_name)
+            markers = self._tmdl_markers(table_name)
+            if markers:
+                # Also check if table is hidden AND has date hierarchy pattern
+                is_hidden = b'isHidden' in markers
+                has_date_hierarchy = b"'Date Hierarchy'" in markers or b'"Date Hierarchy"' in markers
+                has_calendar_source = b'Calendar(' in markers
+                
+                # Auto date table if has Power BI annotations OR is hidden date table with hierarchy
+                if (not markers.isdisjoint(_AUTO_DATE_PATTERNS) or
+                    (is_hidden and has_date_hierarchy and has_calendar_source)):
+                    auto_date_tables.append(table_name)
+                    if log_info:
                         logger.info(f"AUTO DATE TABLE BY TMDL: '{table_name}' (hidden={is_hidden}, hierarchy={has_date_hierarchy}, calendar={has_calendar_source})")
-                        continue
-                        
-                except Exception as e:
-                    logger.warning(f"Could not read TMDL file for {table_name}: {e}")
+                    continue
                     
         logger.info(f"🗓️ IDENTIFIED {len(auto_date_tables)} AUTO DATE TABLES TO EXCLUDE: {auto_date_tables[:5]}...")
         return auto_date_tables
         
     def identify_time_period_tables(self, table_names: List[str], calendar_tables: List[str], connections: Dict[str, Set[str]]) -> List[str]:
         """UNIVERSAL: Identify time/period-related tables based on naming patterns and calendar connections"""
+        log_info = logger.isEnabledFor(logging.INFO)
         time_period_tables = []
-        
-        # Universal time/period indicators (language-agnostic patterns)
-        time_period_indicators = [
-            'period', 'time', 'date', 'calendar', 'fiscal', 'quarter', 'month', 'year',
-            'cycle', 'season', 'week', 'day', 'hour', 'minute', 'interval',
-            'duration', 'span', 'range', 'tempo', 'zeit', 'temps', 'hora'  # Multi-language support
-        ]
+        cal_set = frozenset(calendar_tables)
         
         for table_name in table_names:
-            name_lower = table_name.lower()
+            name_lower = self.lower_name(table_name)
             
             # Check for time/period patterns in name
-            is_time_period = any(indicator in name_lower for indicator in time_period_indicators)
+            is_time_period = _TIME_PERIOD_RE.search(name_lower) is not None
             
             # Check if table connects to calendar tables (relationship-based)
-            connects_to_calendar = False
-            table_connections = connections.get(table_name, set())
-            if any(cal_table in table_connections for cal_table in calendar_tables):
-                connects_to_calendar = True
+            connects_to_calendar = not cal_set.isdisjoint(connections.get(table_name, ()))
                 
             # Include if either pattern-based or relationship-based match
             if is_time_period or connects_to_calendar:
                 time_period_tables.append(table_name)
-                logger.info(f"TIME/PERIOD TABLE: '{table_name}' (pattern={is_time_period}, calendar_connected={connects_to_calendar})")
+                if log_info:
+                    logger.info(f"TIME/PERIOD TABLE: '{table_name}' (pattern={is_time_period}, calendar_connected={connects_to_calendar})")
                 
         return time_period_tables
         
     def identify_calendar_connected_specials(self, table_names: List[str], calendar_tables: List[str], 
                                            connections: Dict[str, Set[str]], excluded_tables: Set[str]) -> List[str]:
         """UNIVERSAL: Identify tables ONLY connected to calendar for special positioning"""
+        log_info = logger.isEnabledFor(logging.INFO)
         calendar_connected_specials = []
+        cal_set = frozenset(calendar_tables)
         
         for table_name in table_names:
             if table_name in excluded_tables:
                 continue
                 
-            table_connections = connections.get(table_name, set())
+            table_connections = connections.get(table_name, _EMPTY)
             
             # UNIVERSAL LOGIC: Only tables EXCLUSIVELY connected to calendar
-            calendar_connections = table_connections.intersection(set(calendar_tables))
-            non_calendar_connections = table_connections - set(calendar_tables)
+            calendar_connections = table_connections & cal_set
+            non_calendar_connections = table_connections - cal_set
             
             # Must connect ONLY to calendar (no other connections)
             if len(calendar_connections) > 0 and len(non_calendar_connections) == 0:
                 calendar_connected_specials.append(table_name)
-                logger.info(f"CALENDAR-CONNECTED SPECIAL: '{table_name}' (only connects to calendar)")
+                if log_info:
+                    logger.info(f"CALENDAR-CONNECTED SPECIAL: '{table_name}' (only connects to calendar)")
                 
         return calendar_connected_specials
         
-    def identify_parameter_tables(self, table_names: List[str]) -> List[str]:
-        """UNIVERSAL: Identify parameter tables using TMDL properties and universal naming patterns"""
-        parameter_tables = []
-        tmdl_files = self.base_engine._find_tmdl_files()
+    def _special_table_flags(self, table_name: str) -> tuple:
+        """UNIVERSAL: (is parameter table, is special disconnected table) for one table"""
+        flags = self._special_flags_cache.get(table_name)
+        if flags is not None:
+            return flags
+        
+        name_lower = self.lower_name(table_name)
+        
+        # Check universal naming patterns first
+        is_system = table_name.startswith('.')  # Hidden/system tables
+        is_parameter = is_system or _PARAMETER_RE.search(name_lower) is not None
+        is_special = is_system or _DISCONNECTED_RE.search(name_lower) is not None
         
-        # Universal parameter indicators
-        parameter_indicators = [
-            'param', 'parameter', 'config', 'setting', 'option', 'preference',
-            'variable', 'constant', 'lookup', 'reference', 'master',
-            'código', 'parametro', 'configuración'  # Multi-language support
-        ]
+        # Check TMDL content for parameter-like properties only when a name check missed
+        if not (is_parameter and is_special):
+            markers = self._tmdl_markers(table_name)
+            is_parameter = is_parameter or not markers.isdisjoint(_PARAMETER_PATTERNS)
+            is_special = is_special or not markers.isdisjoint(_SPECIAL_PATTERNS)
+        
+        flags = self._special_flags_cache[table_name] = (is_parameter, is_special)
+        return flags
+        
+    def _scan_special_tables(self, table_names: List[str]) -> tuple:
+        """UNIVERSAL: Identify (parameter tables, special disconnected tables) in one pass"""
+        parameter_tables = []
+        special_tables = []
         
         for table_name in table_names:
-            name_lower = table_name.lower()
-            
-            # Check universal naming patterns first
-            if (table_name.startswith('.') or  # Hidden/system tables
-                any(indicator in name_lower for indicator in parameter_indicators)):
+            is_parameter, is_special = self._special_table_flags(table_name)
+            if is_parameter:
                 parameter_tables.append(table_name)
-                continue
+            if is_special:
+                special_tables.append(table_name)
                 
-            # Check TMDL content for parameter metadata (universal approach)
-            tmdl_file = tmdl_files.get(table_name)
-            if tmdl_file and tmdl_file.exists():
-                try:
-                    content = tmdl_file.read_text(encoding='utf-8')
-                    # Look for parameter-related TMDL properties
-                    parameter_patterns = [
-                        'extendedProperty ParameterMetadata',
-                        'isHidden = true',
-                        'type = Parameter'
-                    ]
-                    if any(pattern in content for pattern in parameter_patterns):
-                        parameter_tables.append(table_name)
-                        continue
-                except Exception as e:
-                    logger.warning(f"Could not read TMDL file for {table_name}: {e}")
-                    
+        return parameter_tables, special_tables
+        
+    def identify_parameter_tables(self, table_names: List[str]) -> List[str]:
+        """UNIVERSAL: Identify parameter tables using TMDL properties and universal naming patterns"""
+        parameter_tables = self._scan_special_tables(table_names)[0]
         logger.info(f"Identified parameter tables: {parameter_tables}")
         return parameter_tables
         
+    def _is_calculation_group(self, table_name: str) -> bool:
+        """UNIVERSAL: Check the TMDL properties of one table for a calculation group"""
+        return b'calculationGroup' in self._tmdl_markers(table_name)
+        
     def identify_calculation_groups(self, table_names: List[str]) -> List[str]:
         """UNIVERSAL: Identify calculation group tables using TMDL properties"""
-        calc_group_tables = []
-        tmdl_files = self.base_engine._find_tmdl_files()
-        
-        for table_name in table_names:
-            tmdl_file = tmdl_files.get(table_name)
-            if tmdl_file and tmdl_file.exists():
-                try:
-                    content = tmdl_file.read_text(encoding='utf-8')
-                    # Universal TMDL pattern for calculation groups
-                    if 'calculationGroup' in content:
-                        calc_group_tables.append(table_name)
-                except Exception as e:
-                    logger.warning(f"Could not read TMDL file for {table_name}: {e}")
+        calc_group_tables = [table_name for table_name in table_names if self._is_calculation_group(table_name)]
                     
         logger.info(f"Identified calculation group tables: {calc_group_tables}")
         return calc_group_tables
         
-    def identify_metrics_tables(self, table_names: List[str], connections: Dict[str, Set[str]]) -> List[str]:
-        """UNIVERSAL: Enhanced measure table detection with strict requirements"""
-        metrics_tables = []
-        tmdl_files = self.base_engine._find_tmdl_files()
-        
-        for table_name in table_names:
-            name_lower = table_name.lower()
-            connection_count = len(connections.get(table_name, set()))
+    def _is_metrics_table(self, table_name: str, connection_count: int, log_info: bool) -> bool:
+        """UNIVERSAL: Strict measure table check for one table"""
+        # STRICT REQUIREMENT 1: Must be disconnected (no relationships)
+        if connection_count != 0:
+            return False
             
-            # STRICT REQUIREMENT 1: Must be disconnected (no relationships)
-            if connection_count != 0:
-                continue
-                
-            # Check TMDL content to count regular vs calculated columns
-            tmdl_file = tmdl_files.get(table_name)
-            if not tmdl_file or not tmdl_file.exists():
-                continue
+        # Check TMDL content to count regular vs calculated columns
+        content = self._tmdl_bytes(table_name)
+        if content is None:
+            return False
+            
+        try:
+            # Count regular (non-calculated) and calculated columns in one pass
+            regular_column_count, calculated_column_count = _count_columns(content)
+                    
+            # STRICT REQUIREMENT 2: Must have only 1 regular column OR be a pure measures table (0 regular columns)
+            if regular_column_count > 1:
+                return False
                 
-            try:
-                content = tmdl_file.read_text(encoding='utf-8')
+            # For pure measures tables (0 regular columns), require that it has measures
+            if regular_column_count == 0:
+                # Check if table has measures (pure measures table)
+                markers = self._tmdl_markers(table_name)
+                has_measures = b'measure ' in markers and not markers.isdisjoint(_MEASURE_PATTERNS)
+                if not has_measures:
+                    return False
                 
-                # Count regular columns (non-calculated)
-                regular_column_count = 0
-                calculated_column_count = 0
+            # NOW check naming indicators for enhanced detection
+            name_lower = self.lower_name(table_name)
+            naming_match = False
+            
+            # Check for non-alphabetical prefix + "measure" pattern
+            if (table_name.startswith(('_', '.', '*', '-', '#')) and 
+                'measure' in name_lower):
+                naming_match = True
+                if log_info:
+                    logger.info(f"ENHANCED METRICS TABLE DETECTED: '{table_name}' (disconnected + 1 column + naming pattern)")
                 
-                # Simple parsing for column types
-                lines = content.split('\n')
+            # Also check for traditional metrics patterns
+            elif _METRICS_RE.search(name_lower):
+                naming_match = True
+                if log_info:
+                    logger.info(f"TRADITIONAL METRICS TABLE DETECTED: '{table_name}' (disconnected + 1 column + keyword)")
                 
-                for line in lines:
-                    line = line.strip()
-                    
-                    # Detect column definitions
-                    if line.startswith('column ') and not line.startswith('column\t'):
-                        # This is a column definition
-                        if 'dataType:' in line or 'type:' in line:
-                            # Look ahead for calculated column indicators
-                            if 'expression:' in content[content.find(line):content.find(line) + 200]:
-                                calculated_column_count += 1
-                            else:
-                                regular_column_count += 1
-                        else:
-                            regular_column_count += 1
-                    elif 'expression =' in line or 'expression:' in line:
-                        # This indicates a calculated column
-                        calculated_column_count += 1
-                        
-                # STRICT REQUIREMENT 2: Must have only 1 regular column OR be a pure measures table (0 regular columns)
-                if regular_column_count > 1:
-                    continue
-                    
-                # For pure measures tables (0 regular columns), require that it has measures
-                if regular_column_count == 0:
-                    # Check if table has measures (pure measures table)
-                    has_measures = 'measure ' in content and ('lineageTag:' in content or 'formatString:' in content)
-                    if not has_measures:
-                        continue
-                    
-                # NOW check naming indicators for enhanced detection
-                naming_match = False
+            if naming_match and log_info:
+                logger.info(f"METRICS TABLE: '{table_name}' (connections=0, regular_columns={regular_column_count}, calculated_columns={calculated_column_count})")
+            return naming_match
                 
-                # Check for non-alphabetical prefix + "measure" pattern
-                if (table_name.startswith(('_', '.', '*', '-', '#')) and 
-                    'measure' in name_lower):
-                    naming_match = True
-                    logger.info(f"ENHANCED METRICS TABLE DETECTED: '{table_name}' (disconnected + 1 column + naming pattern)")
-                    
-                # Also check for traditional metrics patterns
-                elif any(keyword in name_lower for keyword in ['metric', 'measure', 'kpi', 'score']):
-                    naming_match = True
-                    logger.info(f"TRADITIONAL METRICS TABLE DETECTED: '{table_name}' (disconnected + 1 column + keyword)")
-                    
-                if naming_match:
-                    metrics_tables.append(table_name)
-                    logger.info(f"METRICS TABLE: '{table_name}' (connections=0, regular_columns={regular_column_count}, calculated_columns={calculated_column_count})")
-                    
-            except Exception as e:
-                logger.warning(f"Could not analyze TMDL file for {table_name}: {e}")
+        except Exception as e:
+            logger.warning(f"Could not analyze TMDL file for {table_name}: {e}")
+            return False
+        
+    def identify_metrics_tables(self, table_names: List[str], connections: Dict[str, Set[str]]) -> List[str]:
+        """UNIVERSAL: Enhanced measure table detection with strict requirements"""
+        log_info = logger.isEnabledFor(logging.INFO)
+        metrics_tables = [table_name for table_name in table_names
+                          if self._is_metrics_table(table_name, len(connections.get(table_name, _EMPTY)), log_info)]
                 
         logger.info(f"Enhanced metrics table detection found {len(metrics_tables)} tables: {metrics_tables}")
         return metrics_tables
         
     def identify_special_disconnected_tables(self, table_names: List[str]) -> List[str]:
         """UNIVERSAL: Identify special disconnected tables that should be in parameter grid"""
-        special_tables = []
-        tmdl_files = self.base_engine._find_tmdl_files()
-        
-        # Universal disconnected table indicators
-        disconnected_indicators = [
-            'parameter', 'config', 'setting', 'lookup', 'reference', 'master',
-            'static', 'constant', 'readonly', 'system'
-        ]
-        
-        for table_name in table_names:
-            name_lower = table_name.lower()
-            
-            # Universal patterns for special disconnected tables
-            if (table_name.startswith('.') or  # System/hidden tables
-                any(indicator in name_lower for indicator in disconnected_indicators)):
-                special_tables.append(table_name)
-                continue
-                
-            # Check TMDL content for parameter-like properties
-            tmdl_file = tmdl_files.get(table_name)
-            if tmdl_file and tmdl_file.exists():
-                try:
-                    content = tmdl_file.read_text(encoding='utf-8')
-                    special_patterns = [
-                        'extendedProperty ParameterMetadata',
-                        'calculationGroup',
-                        'isHidden = true'
-                    ]
-                    if any(pattern in content for pattern in special_patterns):
-                        special_tables.append(table_name)
-                except Exception as e:
-                    logger.warning(f"Could not read TMDL file for {table_name}: {e}")
-                    
+        special_tables = self._scan_special_tables(table_names)[1]
         logger.info(f"Identified special disconnected tables for parameter grid: {special_tables}")
         return special_tables
         
     def detect_bidirectional_relationships(self, connections: Dict[str, Set[str]]) -> List[tuple]:
         """UNIVERSAL: Detect 1:1 bidirectional pairs for opposite-side placement"""
+        log_info = logger.isEnabledFor(logging.INFO)
         bidirectional_pairs = []
-        processed_pairs = set()
+        
+        # Report each pair from whichever end the graph lists first - no duplicate tracking needed
+        position = {table: index for index, table in enumerate(connections)}
         
         for table1, connected_tables in connections.items():
+            table1_position = position[table1]
             for table2 in connected_tables:
                 # Check if connection exists in both directions
-                if table1 in connections.get(table2, set()):
-                    # Create sorted pair to avoid duplicates
-                    pair = tuple(sorted([table1, table2]))
-                    if pair not in processed_pairs:
-                        bidirectional_pairs.append(pair)
-                        processed_pairs.add(pair)
+                if position.get(table2, -1) >= table1_position and table1 in connections[table2]:
+                    # Order the pair for a stable orientation (no list + sort per edge)
+                    pair = (table1, table2) if table1 <= table2 else (table2, table1)
+                    bidirectional_pairs.append(pair)
+                    if log_info:
                         logger.info(f"BIDIRECTIONAL RELATIONSHIP: {table1} ↔ {table2}")
         
         return bidirectional_pairs
         
     def analyze_relationship_cardinality(self, connections: Dict[str, Set[str]]) -> Dict[tuple, str]:
         """UNIVERSAL: Analyze relationship types for better placement"""
+        log_info = logger.isEnabledFor(logging.INFO)
         relationship_types = {}
         
+        # Connection counts once per table instead of once per edge end
+        connection_strengths = {table: len(connected_tables) for table, connected_tables in connections.items()}
+        
         for table1, connected_tables in connections.items():
+            connection_strength_1 = connection_strengths[table1]
             for table2 in connected_tables:
                 # Check cardinality patterns
-                if table1 in connections.get(table2, set()):
+                if table1 in connections.get(table2, ()):
                     # Bidirectional = potential 1:1 or M:M
-                    connection_strength_1 = len(connections[table1])
-                    connection_strength_2 = len(connections[table2])
+                    connection_strength_2 = connection_strengths[table2]
                     
                     if connection_strength_1 == 1 and connection_strength_2 == 1:
                         relationship_types[(table1, table2)] = "one_to_one"
-                        logger.info(f"1:1 RELATIONSHIP: {table1} ↔ {table2}")
+                        if log_info:
+                            logger.info(f"1:1 RELATIONSHIP: {table1} ↔ {table2}")
                     elif connection_strength_1 > 3 and connection_strength_2 > 3:
                         relationship_types[(table1, table2)] = "many_to_many"
-                        logger.info(f"M:M RELATIONSHIP: {table1} ↔ {table2}")
+                        if log_info:
+                            logger.info(f"M:M RELATIONSHIP: {table1} ↔ {table2}")
                     else:
                         relationship_types[(table1, table2)] = "one_to_many"
-                        logger.info(f"1:M RELATIONSHIP: {table1} ↔ {table2}")
+                        if log_info:
+                            logger.info(f"1:M RELATIONSHIP: {table1} ↔ {table2}")
                 else:
                     relationship_types[(table1, table2)] = "many_to_one"
         
         return relationship_types
         
-    def calculate_table_score(self, table_name: str, connections: Dict[str, Set[str]]) -> Dict[str, Any]:
-        """UNIVERSAL: Calculate hybrid score for table classification without domain-specific logic"""
-        name_lower = table_name.lower()
-        connection_count = len(connections.get(table_name, set()))
+    def _get_naming_scores(self, table_name: str) -> tuple:
+        """Get (fact name score, dim name score, strong fact naming, explicit dim prefix), cached per table"""
+        scores = self._naming_scores.get(table_name)
+        if scores is None:
+            name_lower = self.lower_name(table_name)
+            
+            # Strong fact patterns (universal)
+            has_strong_fact_naming = _STRONG_FACT_RE.search(name_lower) is not None
+            
+            fact_name_score = ((25 if has_strong_fact_naming else 0) +
+                               (15 if _FACT_RE.search(name_lower) else 0))      # Universal fact indicators
+            dim_name_score = ((25 if _DIM_RE.search(name_lower) else 0) +       # Universal dimension indicators
+                              (20 if name_lower.startswith(_DIM_PREFIXES) else 0))  # Universal dimension prefixes
+            
+            scores = self._naming_scores[table_name] = (
+                fact_name_score, dim_name_score, has_strong_fact_naming,
+                name_lower.startswith(_EXPLICIT_DIM_PREFIXES)
+            )
+        return scores
+        
+    def calculate_table_score(self, table_name: str, connections: Dict[str, Set[str]],
+                              special_disconnected: Set[str] = None) -> Dict[str, Any]:
+        """UNIVERSAL: Calculate hybrid score for table classification without domain-specific logic
+        
+        Callers that already identified the special disconnected tables can pass them in.
+        """
+        log_info = logger.isEnabledFor(logging.INFO)
+        connection_count = len(connections.get(table_name, _EMPTY))
         
         # Check if this is a special disconnected table FIRST
-        special_disconnected = self.identify_special_disconnected_tables([table_name])
+        if special_disconnected is None:
+            special_disconnected = self.identify_special_disconnected_tables([table_name])
         if table_name in special_disconnected:
             return {
                 'table_name': table_name,
@@ -357,65 +498,15 @@ class TableCategorizer:
                 'classification': 'disconnected'
             }
         
-        # UNIVERSAL naming pattern scores
-        fact_name_score = 0
-        dim_name_score = 0
-        
-        # Universal fact indicators (cross-industry patterns)
-        fact_indicators = [
-            'fact', 'trans', 'event', 'activity', 'record', 'log', 'history',
-            'operation', 'process', 'action', 'movement', 'entry', 'line',
-            'detail', 'item', 'occurrence', 'instance', 'measure'
-        ]
-        
-        # Universal dimension indicators
-        dim_indicators = [
-            'dim', 'dimension', 'master', 'lookup', 'reference', 'category',
-            'type', 'class', 'group', 'entity', 'object', 'subject'
-        ]
-        
-        # Strong fact patterns (universal)
-        strong_fact_patterns = ['fact_', '_fact', 'fact ', ' fact']
-        for pattern in strong_fact_patterns:
-            if pattern in name_lower:
-                fact_name_score += 25
-                break
-        
-        # Check for universal fact indicators
-        for indicator in fact_indicators:
-            if indicator in name_lower:
-                fact_name_score += 15
-                break
-        
-        # Universal dimension indicators
-        for indicator in dim_indicators:
-            if indicator in name_lower:
-                dim_name_score += 25
-                break
-        
-        # Universal dimension prefixes
-        dim_prefixes = ['d_', 'dim_', 'dim-', 'dim ', 'master_', 'ref_', 'lookup_']
-        for prefix in dim_prefixes:
-            if name_lower.startswith(prefix):
-                dim_name_score += 20
-                break
+        # UNIVERSAL naming pattern scores (name-only, computed once per table)
+        fact_name_score, dim_name_score, has_strong_fact_naming, has_explicit_dim_prefix = \
+            self._get_naming_scores(table_name)
                 
         # Universal calendar indicators
-        calendar_indicators = ['calendar', 'date', 'time', 'period']
-        is_calendar = any(cal in name_lower for cal in calendar_indicators)
+        is_calendar = self._is_calendar_name(table_name)
         
         # Connection-based scoring (universal logic)
-        connection_score = 0
-        if connection_count >= 5:
-            connection_score += 15
-        elif connection_count >= 3:
-            connection_score += 10
-        elif connection_count >= 2:
-            connection_score += 5
-        elif connection_count == 1:
-            connection_score -= 3
-        elif connection_count == 0:
-            connection_score -= 5
+        connection_score = _CONNECTION_SCORES[min(connection_count, 5)]
             
         # Calculate final scores
         total_fact_score = fact_name_score + max(0, connection_score)
@@ -423,20 +514,23 @@ class TableCategorizer:
         
         # UNIVERSAL CLASSIFICATION RULES
         # Priority 1: Explicit fact naming
-        if any(pattern in name_lower for pattern in ['fact_', '_fact', 'fact ', ' fact']):
+        if has_strong_fact_naming:
             classification = 'fact'
             total_fact_score = max(total_fact_score, total_dim_score + 50)
-            logger.info(f"FORCED FACT: '{table_name}' due to explicit fact naming")
+            if log_info:
+                logger.info(f"FORCED FACT: '{table_name}' due to explicit fact naming")
         # Priority 2: Explicit dimension naming
-        elif any(name_lower.startswith(prefix) for prefix in ['dim_', 'dim-', 'dim ', 'd_']):
+        elif has_explicit_dim_prefix:
             classification = 'dimension'
             total_dim_score = max(total_dim_score, total_fact_score + 10)
-            logger.info(f"FORCED DIMENSION: '{table_name}' due to explicit dimension naming")
+            if log_info:
+                logger.info(f"FORCED DIMENSION: '{table_name}' due to explicit dimension naming")
         # Priority 3: Connection count rule (universal threshold)
         elif connection_count >= 3:
             classification = 'fact'
             total_fact_score += 20
-            logger.info(f"FACT BY CONNECTIONS: '{table_name}' has {connection_count} connections")
+            if log_info:
+                logger.info(f"FACT BY CONNECTIONS: '{table_name}' has {connection_count} connections")
         else:
             # Bias adjustment for ambiguous cases
             if total_fact_score > 0 and connection_count >= 2:
@@ -444,8 +538,9 @@ class TableCategorizer:
             
             classification = 'fact' if total_fact_score > total_dim_score else 'dimension'
         
-        logger.info(f"Table '{table_name}': fact_score={total_fact_score}, dim_score={total_dim_score}, "
-                   f"connections={connection_count}, classification={classification}")
+        if log_info:
+            logger.info(f"Table '{table_name}': fact_score={total_fact_score}, dim_score={total_dim_score}, "
+                       f"connections={connection_count}, classification={classification}")
         
         return {
             'table_name': table_name,
@@ -458,10 +553,17 @@ class TableCategorizer:
         
     def categorize_tables(self, table_names: List[str], connections: Dict[str, Set[str]]) -> Dict[str, List[str]]:
         """UNIVERSAL: Categorize tables using universal principles only"""
+        log_info = logger.isEnabledFor(logging.INFO)
         
         logger.info("🌍 UNIVERSAL TABLE CATEGORIZATION - NO HARDCODED NAMES")
         logger.info(f"📊 INPUT TABLES: {len(table_names)} total")
         
+        # Interned names compare by identity in the many set/dict lookups below
+        table_names = [sys.intern(name) for name in table_names]
+        
+        # Lowercase all names up front - every phase below reads them
+        self._prime_lower_cache(table_names)
+        
         # PHASE 0: Filter out Power BI auto date/time tables
         logger.info("🔍 PHASE 0: FILTERING AUTO DATE TABLES")
         auto_date_tables = self.identify_auto_date_tables(table_names)
@@ -473,13 +575,16 @@ class TableCategorizer:
         # Use filtered table names for all further processing
         table_names = filtered_table_names
         
+        # Connection counts are read in Phase 2, the fallback and Phase 3
+        conn_counts = {name: len(connections.get(name, _EMPTY)) for name in table_names}
+        
         fact_tables = []
-        l1_dimensions = []
-        l2_dimensions = []
-        l3_dimensions = []
-        l4_plus_dimensions = []
+        # Dimension levels are insertion-ordered dicts used as ordered sets (O(1) membership and removal)
+        l1_dimensions = {}
+        l2_dimensions = {}
+        l3_dimensions = {}
+        l4_plus_dimensions = {}
         calendar_tables = []
-        parameter_tables = []
         calculation_groups = []
         disconnected_tables = []
         dimension_extensions = {}
@@ -489,9 +594,21 @@ class TableCategorizer:
         # PHASE 1: Identify special table types using universal patterns
         logger.info("🔍 PHASE 1: UNIVERSAL SPECIAL TABLE IDENTIFICATION")
         
-        parameter_tables = self.identify_parameter_tables(table_names)
-        calculation_groups = self.identify_calculation_groups(table_names)
-        metrics_tables = self.identify_metrics_tables(table_names, connections)
+        # Parameter and special disconnected tables from one scan, then calculation group and metrics checks
+        parameter_tables, special_disconnected = self._scan_special_tables(table_names)
+        metrics_tables = []
+        for table_name in table_names:
+            if self._is_calculation_group(table_name):
+                calculation_groups.append(table_name)
+            if self._is_metrics_table(table_name, conn_counts[table_name], log_info):
+                metrics_tables.append(table_name)
+        
+        if log_info:
+            logger.info(f"Identified parameter tables: {parameter_tables}")
+            logger.info(f"Identified special disconnected tables for parameter grid: {special_disconnected}")
+            logger.info(f"Identified calculation group tables: {calculation_groups}")
+            logger.info(f"Enhanced metrics table detection found {len(metrics_tables)} tables: {metrics_tables}")
+        special_disconnected = frozenset(special_disconnected)
         
         processed_tables.update(parameter_tables)
         processed_tables.update(calculation_groups)
@@ -503,50 +620,57 @@ class TableCategorizer:
         
         # Universal hybrid scoring - SKIP DISCONNECTED TABLES (they can't be facts)
         for table_name in table_names:
-            if table_name in parameter_tables or table_name in calculation_groups or table_name in metrics_tables:
+            # Phase 1 tables are already in processed_tables
+            if table_name in processed_tables:
                 continue
                 
             # CRITICAL: Skip disconnected tables from fact detection
-            connection_count = len(connections.get(table_name, set()))
+            connection_count = conn_counts[table_name]
             if connection_count == 0:
-                logger.info(f"SKIPPING DISCONNECTED TABLE FROM FACT DETECTION: '{table_name}' (0 connections)")
+                if log_info:
+                    logger.info(f"SKIPPING DISCONNECTED TABLE FROM FACT DETECTION: '{table_name}' (0 connections)")
                 continue
                 
-            score = self.calculate_table_score(table_name, connections)
+            score = self.calculate_table_score(table_name, connections, special_disconnected)
             if score['classification'] == 'fact':
                 fact_tables.append(table_name)
                 potential_facts.add(table_name)
-                logger.info(f"FACT identified: {table_name}")
+                if log_info:
+                    logger.info(f"FACT identified: {table_name}")
         
         # Universal connection-based fallback - EXCLUDE DISCONNECTED TABLES
         if not fact_tables:
             logger.warning("No facts found by scoring, using universal connection-based approach")
-            connection_counts = [(name, len(connections.get(name, set()))) for name in table_names 
-                               if name not in parameter_tables and name not in calculation_groups and name not in metrics_tables]
-            connection_counts.sort(key=lambda x: x[1], reverse=True)
+            candidates = [name for name in table_names if name not in processed_tables]
             
-            for name, count in connection_counts[:10]:  # Top 10 most connected
+            # Top 10 most connected - nlargest keeps ties in table order, like a stable reverse sort
+            for name in heapq.nlargest(10, candidates, key=conn_counts.__getitem__):
+                count = conn_counts[name]
                 if count >= 2:  # Must have connections to be a fact
                     fact_tables.append(name)
                     potential_facts.add(name)
-                    logger.info(f"FACT by connections: {name} ({count} connections)")
+                    if log_info:
+                        logger.info(f"FACT by connections: {name} ({count} connections)")
                     
         processed_tables.update(fact_tables)
         
+        # Freeze once - Phase 3 runs star-schema and distance checks against it per table
+        potential_facts = frozenset(potential_facts)
+        
         # PHASE 3: Universal table categorization
         logger.info("🔍 PHASE 3: UNIVERSAL TABLE CATEGORIZATION")
         
-        special_disconnected = self.identify_special_disconnected_tables(table_names)
+        # One multi-source BFS from the facts instead of one BFS per table
+        fact_distances = self.relationship_analyzer.calculate_distances_to_facts(connections, potential_facts)
         
         for table_name in table_names:
             if table_name in processed_tables:
                 continue
                 
-            name_lower = table_name.lower()
-            connection_count = len(connections.get(table_name, set()))
+            connection_count = conn_counts[table_name]
             
             # Universal calendar detection
-            if any(cal in name_lower for cal in ['calendar', 'date', 'time', 'period']):
+            if self._is_calendar_name(table_name):
                 calendar_tables.append(table_name)
                 processed_tables.add(table_name)
                 continue
@@ -569,23 +693,23 @@ class TableCategorizer:
                 
             # Universal dimension level classification
             if self.relationship_analyzer.is_star_schema_table(table_name, connections, potential_facts):
-                l1_dimensions.append(table_name)
+                l1_dimensions[table_name] = None
                 processed_tables.add(table_name)
                 continue
                 
             # Universal snowflake detection
-            distance = self.relationship_analyzer.calculate_distance_to_facts(table_name, connections, potential_facts)
+            distance = fact_distances.get(table_name, 999)
             
             if distance == 1:
-                l1_dimensions.append(table_name)
+                l1_dimensions[table_name] = None
             elif distance == 2:
-                l2_dimensions.append(table_name)
+                l2_dimensions[table_name] = None
             elif distance == 3:
-                l3_dimensions.append(table_name)
+                l3_dimensions[table_name] = None
             elif distance >= 4:
-                l4_plus_dimensions.append(table_name)
+                l4_plus_dimensions[table_name] = None
             else:
-                l1_dimensions.append(table_name)  # Default fallback
+                l1_dimensions[table_name] = None  # Default fallback
                 
             processed_tables.add(table_name)
         
@@ -619,24 +743,35 @@ class TableCategorizer:
                 
             if relationship_type == 'extension' and base_table:
                 # Remove from current position
-                for level_list in [l1_dimensions, l2_dimensions, l3_dimensions, l4_plus_dimensions]:
-                    if extension_table in level_list:
-                        level_list.remove(extension_table)
+                for level_tables in (l1_dimensions, l2_dimensions, l3_dimensions, l4_plus_dimensions):
+                    if extension_table in level_tables:
+                        del level_tables[extension_table]
+                        break
                 
                 # Place one level further from facts than base
                 if base_table in l1_dimensions:
-                    l2_dimensions.append(extension_table)
-                    logger.info(f"Extension {extension_table} moved to L2 (base {base_table} in L1)")
+                    l2_dimensions[extension_table] = None
+                    if log_info:
+                        logger.info(f"Extension {extension_table} moved to L2 (base {base_table} in L1)")
                 elif base_table in l2_dimensions:
-                    l3_dimensions.append(extension_table)
-                    logger.info(f"Extension {extension_table} moved to L3 (base {base_table} in L2)")
+                    l3_dimensions[extension_table] = None
+                    if log_info:
+                        logger.info(f"Extension {extension_table} moved to L3 (base {base_table} in L2)")
                 elif base_table in l3_dimensions:
-                    l4_plus_dimensions.append(extension_table)
-                    logger.info(f"Extension {extension_table} moved to L4+ (base {base_table} in L3)")
+                    l4_plus_dimensions[extension_table] = None
+                    if log_info:
+                        logger.info(f"Extension {extension_table} moved to L4+ (base {base_table} in L3)")
                 else:
                     # Default: assume base is L1, move extension to L2
-                    l2_dimensions.append(extension_table)
-                    logger.info(f"Extension {extension_table} moved to L2 (default - base {base_table})")
+                    l2_dimensions[extension_table] = None
+                    if log_info:
+                        logger.info(f"Extension {extension_table} moved to L2 (default - base {base_table})")
+        
+        # Materialize the dimension levels back into lists for callers
+        l1_dimensions = list(l1_dimensions)
+        l2_dimensions = list(l2_dimensions)
+        l3_dimensions = list(l3_dimensions)
+        l4_plus_dimensions = list(l4_plus_dimensions)
         
         # Final verification
         all_categorized = (
@@ -649,12 +784,14 @@ class TableCategorizer:
             logger.warning(f"🚨 MISSING TABLES: {missing_tables} - adding to disconnected")
             disconnected_tables.extend(missing_tables)
         
-        logger.info(f"🌍 UNIVERSAL CATEGORIZATION COMPLETE")
-        logger.info(f"  Facts: {len(fact_tables)}")
-        logger.info(f"  L1-L4+ Dimensions: {len(l1_dimensions + l2_dimensions + l3_dimensions + l4_plus_dimensions)}")
-        logger.info(f"  Special tables: {len(calendar_tables + metrics_tables + parameter_tables + calculation_groups)}")
-        logger.info(f"  Extensions: {len(dimension_extensions)}")
-        logger.info(f"  🗓️ AUTO DATE TABLES EXCLUDED: {len(auto_date_tables)}")
+        if log_info:
+            # Summed lengths - no throwaway concatenated lists just to count them
+            logger.info(f"🌍 UNIVERSAL CATEGORIZATION COMPLETE")
+            logger.info(f"  Facts: {len(fact_tables)}")
+            logger.info(f"  L1-L4+ Dimensions: {len(l1_dimensions) + len(l2_dimensions) + len(l3_dimensions) + len(l4_plus_dimensions)}")
+            logger.info(f"  Special tables: {len(calendar_tables) + len(metrics_tables) + len(parameter_tables) + len(calculation_groups)}")
+            logger.info(f"  Extensions: {len(dimension_extensions)}")
+            logger.info(f"  🗓️ AUTO DATE TABLES EXCLUDED: {len(auto_date_tables)}")
         
         return {
             'fact_tables': fact_tables,
@@ -6,13 +6,24 @@ Provides common functionality for all layout engines
 
 import json
 import logging
+import os
+import sys
 import urllib.parse
 from typing import Dict, List, Tuple, Any, Optional, Set
 from pathlib import Path
 from collections import defaultdict
 
+try:
+    import orjson  # optional: faster diagramLayout.json parsing
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("pbip-tools-mcp")
 
+# macOS AppleDouble metadata files ("._Sales.tmdl") sit next to the real files on non-HFS volumes.
+# Other dot-prefixed names are real content - hidden/system tables start with '.'
+_APPLEDOUBLE_PREFIX = '._'
+
 
 class BaseLayoutEngine:
     """Base class for all layout engines with common PBIP functionality"""
@@ -21,6 +32,11 @@ class BaseLayoutEngine:
         self.pbip_folder = Path(pbip_folder)
         self.semantic_model_path = self._find_semantic_model_path()
         
+        # TMDL file map and sorted table names, cached per (definition, tables) folder mtimes
+        self._tmdl_files_key = None
+        self._tmdl_files_cache: Dict[str, Path] = {}
+        self._table_names_cache: List[str] = []
+        
     def _find_semantic_model_path(self) -> Optional[Path]:
         """Find the actual SemanticModel folder path"""
         for item in self.pbip_folder.iterdir():
@@ -36,16 +52,53 @@ class BaseLayoutEngine:
             decoded = table_name
             
         normalized = decoded.strip().strip("'").strip('"')
-        return normalized
+        return sys.intern(normalized)  # Table names are used as dict/set keys throughout
+        
+    def invalidate_cache(self):
+        """Drop the cached TMDL file map and table names (call after changing the model files)"""
+        self._tmdl_files_key = None
+        self._tmdl_files_cache = {}
+        self._table_names_cache = []
+        
+    def _tmdl_files_cache_key(self, definition_path: Path) -> Optional[tuple]:
+        """Key for the cached TMDL scan: definition and tables folder mtimes"""
+        try:
+            definition_mtime = definition_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        try:
+            tables_mtime = (definition_path / "tables").stat().st_mtime_ns
+        except OSError:
+            tables_mtime = None
+        return (str(definition_path), definition_mtime, tables_mtime)
+        
+    def _scan_table_tmdl_files(self, tables_path: Path) -> Dict[str, Path]:
+        """Map normalized table names to the *.tmdl files in a tables folder (glob("*.tmdl") minus AppleDouble files)"""
+        table_files = {}
+        # scandir: no Path object for entries we skip
+        with os.scandir(tables_path) as entries:
+            for entry in entries:
+                if (os.path.normcase(entry.name).endswith('.tmdl')
+                        and not entry.name.startswith(_APPLEDOUBLE_PREFIX)):
+                    table_name = os.path.splitext(entry.name)[0]
+                    table_files[self._normalize_table_name(table_name)] = Path(entry.path)
+        return table_files
         
     def _find_tmdl_files(self) -> Dict[str, Path]:
-        """Find all TMDL files in the semantic model"""
+        """Find all TMDL files in the semantic model, cached until the model folders change"""
+        return dict(self._cached_tmdl_files())
+        
+    def _cached_tmdl_files(self) -> Dict[str, Path]:
+        """The cached TMDL file map itself (callers must not modify it), rescanned when the model folders change"""
         if not self.semantic_model_path:
             return {}
             
         definition_path = self.semantic_model_path / "definition"
-        if not definition_path.exists():
+        key = self._tmdl_files_cache_key(definition_path)
+        if key is None:
             return {}
+        if key == self._tmdl_files_key:
+            return self._tmdl_files_cache
         
         tmdl_files = {}
         
@@ -55,26 +108,34 @@ class BaseLayoutEngine:
             tmdl_files['model'] = model_file
         
         # Find tables directory
-        tables_dir = definition_path / "tables"
-        if tables_dir.exists():
-            for tmdl_file in tables_dir.glob("*.tmdl"):
-                table_name = tmdl_file.stem
-                normalized_name = self._normalize_table_name(table_name)
-                tmdl_files[normalized_name] = tmdl_file
+        if key[2] is not None:
+            tmdl_files.update(self._scan_table_tmdl_files(definition_path / "tables"))
         
+        self._tmdl_files_key = key
+        self._tmdl_files_cache = tmdl_files
+        self._table_names_cache = sorted(name for name in tmdl_files if name != 'model')  # Skip the main model file
+        logger.debug("Found %d tables: %s", len(self._table_names_cache), self._table_names_cache)
         return tmdl_files
         
     def _get_table_names_from_tmdl(self) -> List[str]:
         """Get all table names from TMDL files with proper normalization"""
-        tmdl_files = self._find_tmdl_files()
-        tables = []
+        if not self._cached_tmdl_files():
+            return []
+        return list(self._table_names_cache)
         
-        for name, file_path in tmdl_files.items():
-            if name != 'model':  # Skip the main model file
-                tables.append(name)
+    def _read_layout_file(self, layout_file: Path) -> Dict[str, Any]:
+        """Load a diagramLayout.json file (orjson when installed)"""
+        if orjson is not None:
+            return orjson.loads(layout_file.read_bytes())
+        with open(layout_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
         
-        logger.info(f"Found {len(tables)} tables: {sorted(tables)}")
-        return sorted(tables)
+    def _write_layout_file(self, layout_file: Path, layout_data: Dict[str, Any]):
+        """Write a diagramLayout.json file with 2-space indentation"""
+        # Always the json module: orjson writes non-ASCII unescaped and formats some floats differently,
+        # so the saved file would depend on whether orjson is installed.
+        # Serialize in one go - json.dump issues a write per encoder chunk
+        layout_file.write_text(json.dumps(layout_data, indent=2), encoding='utf-8')
         
     def _parse_diagram_layout(self) -> Dict[str, Any]:
         """Parse the diagramLayout.json file"""
@@ -87,8 +148,7 @@ class BaseLayoutEngine:
             return {}
         
         try:
-            with open(diagram_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._read_layout_file(diagram_file)
         except Exception as e:
             logger.error(f"Error parsing diagram layout: {e}")
             return {}
@@ -101,8 +161,7 @@ class BaseLayoutEngine:
         diagram_file = self.semantic_model_path / "diagramLayout.json"
         
         try:
-            with open(diagram_file, 'w', encoding='utf-8') as f:
-                json.dump(layout_data, f, indent=2)
+            self._write_layout_file(diagram_file, layout_data)
             return True
         except Exception as e:
             logger.error(f"Error saving diagram layout: {e}")
@@ -7,11 +7,85 @@ Universal dynamic layout with modular components and consistent spacing
 import json
 import math
 import logging
-from typing import Dict, List, Any, Optional
+import re
+from collections import ChainMap, Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
 
 logger = logging.getLogger("pbip-tools-mcp")
 
+# Dimension stack key -> key used by DimensionOptimizer.apply_opposite_side_placement
+_PLACEMENT_KEYS = (
+    ('left_l1_dimensions', 'l1_dimension_left'),
+    ('right_l1_dimensions', 'l1_dimension_right'),
+    ('left_l2_dimensions', 'l2_dimension_left'),
+    ('right_l2_dimensions', 'l2_dimension_right'),
+    ('left_l3_dimensions', 'l3_dimension_left'),
+    ('right_l3_dimensions', 'l3_dimension_right'),
+    ('left_l4_dimensions', 'l4_plus_dimension_left'),
+    ('right_l4_dimensions', 'l4_plus_dimension_right'),
+)
+
+# Chain family base-name patterns
+_FAMILY_PREFIXES = ('Dim_', 'Fact_', 'dim_', 'fact_')  # each ends at its first underscore
+_CAMEL_PART_RE = re.compile(r'[A-Z][a-z]*')
+_LEADING_ALPHA_RE = re.compile(r'^([A-Za-z]+)')
+
+
+@lru_cache(maxsize=4096)
+def _family_base_name(table_name: str) -> str:
+    """Extract the base family name from a table name (cached - names repeat across family scans)"""
+    
+    # Remove common prefixes
+    clean_name = table_name
+    if clean_name.startswith(_FAMILY_PREFIXES):
+        clean_name = clean_name[clean_name.index('_') + 1:]
+    
+    # Look for common base patterns
+    # Example: Property, PropertyAttributes, PropertyList -> Property
+    # Example: Tenant, TenantProgramType -> Tenant
+    
+    # Find the longest common prefix with other words
+    words = clean_name.split('_')
+    if len(words) > 1:
+        return words[0]  # First word is often the base
+    
+    # Check for camelCase patterns
+    camel_parts = _CAMEL_PART_RE.findall(clean_name)
+    if len(camel_parts) > 1:
+        return camel_parts[0]  # First camelCase part
+    
+    # For simple names, use the first part before any numbers or special suffixes
+    base_match = _LEADING_ALPHA_RE.match(clean_name)
+    if base_match:
+        return base_match.group(1)
+    
+    return clean_name
+
+
+# Shared default for tables without relationships
+_EMPTY = frozenset()
+
+# (category, side) bucket used by extension repositioning -> dimension stack key, in lookup order
+_DIMENSION_BUCKETS = (
+    (('l1', 'left'), 'left_l1_dimensions'),
+    (('l1', 'right'), 'right_l1_dimensions'),
+    (('l2', 'left'), 'left_l2_dimensions'),
+    (('l2', 'right'), 'right_l2_dimensions'),
+    (('l3', 'left'), 'left_l3_dimensions'),
+    (('l3', 'right'), 'right_l3_dimensions'),
+    (('l4', 'left'), 'left_l4_dimensions'),
+    (('l4', 'right'), 'right_l4_dimensions'),
+)
+
+# Scan order of the buckets above - a table listed in several buckets is found in the first one
+_BUCKET_ORDER = {bucket: index for index, (bucket, _) in enumerate(_DIMENSION_BUCKETS)}
+
+# Extensions move one level further from facts; L4 is already the maximum distance
+_NEXT_CATEGORY = {'l1': 'l2', 'l2': 'l3', 'l3': 'l4', 'l4': 'l4'}
+
 # Import our modular components with correct paths for our tool structure
 POSITIONING_AVAILABLE = False  # Initialize at module level
 
@@ -41,9 +115,10 @@ except ImportError as e:
 class MiddleOutLayoutEngine:
     """Universal Middle-Out Layout Engine with modular architecture"""
     
-    def __init__(self, pbip_folder: str, base_engine):
+    def __init__(self, pbip_folder: str, base_engine, context=None):
         self.pbip_folder = Path(pbip_folder)
         self.base_engine = base_engine  # Our enhanced layout core
+        self.context = context  # Optional LayoutContext already discovered for this operation
         
         # Layout configuration - Universal consistent spacing
         self.spacing_config = {
@@ -86,29 +161,38 @@ class MiddleOutLayoutEngine:
         
         logger.info("Initializing universal chain alignment engine")
         
-        table_names = self.base_engine._get_table_names_from_tmdl()
-        if not table_names:
-            return []
+        if self.context is not None:
+            # Reuse the tables, graph and categories analyze_table_categorization already built
+            table_names = self.context.table_names
+            if not table_names:
+                return []
+            connections = self.context.connections
+            categorized = self.context.categories
+        else:
+            table_names = self.base_engine._get_table_names_from_tmdl()
+            if not table_names:
+                return []
+                
+            # Build relationship graph using base engine's components
+            connections = self.base_engine.relationship_analyzer.build_relationship_graph()
             
-        # Build relationship graph using base engine's components
-        connections = self.base_engine.relationship_analyzer.build_relationship_graph()
-        
-        # Categorize tables using dynamic analysis
-        logger.info("Analyzing table relationships and categorizing tables...")
-        categorized = self.base_engine.table_categorizer.categorize_tables(table_names, connections)
+            # Categorize tables using dynamic analysis
+            logger.info("Analyzing table relationships and categorizing tables...")
+            categorized = self.base_engine.table_categorizer.categorize_tables(table_names, connections)
         logger.info(f"Table categorization complete: {len(categorized.get('fact_tables', []))} facts, {len(categorized.get('l1_dimensions', []))} L1 dimensions")
         
         # Extract categories AFTER 1:1 extension processing
-        fact_tables = categorized['fact_tables']
-        l1_dimensions = categorized['l1_dimensions']
-        l2_dimensions = categorized['l2_dimensions']
-        l3_dimensions = categorized['l3_dimensions']
-        l4_plus_dimensions = categorized['l4_plus_dimensions']
-        calendar_tables = categorized['calendar_tables']
-        metrics_tables = categorized['metrics_tables']
-        parameter_tables = categorized['parameter_tables']
-        calculation_groups = categorized['calculation_groups']
-        disconnected_tables = categorized['disconnected_tables']
+        # Working copies: the lists below are extended/reordered, and categorized may be a shared LayoutContext
+        fact_tables = list(categorized['fact_tables'])
+        l1_dimensions = list(categorized['l1_dimensions'])
+        l2_dimensions = list(categorized['l2_dimensions'])
+        l3_dimensions = list(categorized['l3_dimensions'])
+        l4_plus_dimensions = list(categorized['l4_plus_dimensions'])
+        calendar_tables = list(categorized['calendar_tables'])
+        metrics_tables = list(categorized['metrics_tables'])
+        parameter_tables = list(categorized['parameter_tables'])
+        calculation_groups = list(categorized['calculation_groups'])
+        disconnected_tables = list(categorized['disconnected_tables'])
         
         logger.info(f"Layout distribution: L1({len(l1_dimensions)}) L2({len(l2_dimensions)}) L3({len(l3_dimensions)}) L4+({len(l4_plus_dimensions)}) Facts({len(fact_tables)})")
         
@@ -121,19 +205,17 @@ class MiddleOutLayoutEngine:
             table_names, calendar_tables, connections, set())
             
         # CRITICAL FIX: Remove calendar specials from ALL categories (including facts AND calendar_tables)
-        fact_tables = [t for t in fact_tables if t not in calendar_connected_specials]
-        calendar_tables = [t for t in calendar_tables if t not in calendar_connected_specials]  # FIX THE DUPLICATE!
-        left_l1_dimensions = [t for t in left_l1_dimensions if t not in calendar_connected_specials]
-        right_l1_dimensions = [t for t in right_l1_dimensions if t not in calendar_connected_specials]
+        # New lists, not in-place: fact/calendar lists are still read from categorized later (FIX THE DUPLICATE!)
+        calendar_special_set = set(calendar_connected_specials)
+        fact_tables, calendar_tables, left_l1_dimensions, right_l1_dimensions = (
+            [t for t in tables if t not in calendar_special_set]
+            for tables in (fact_tables, calendar_tables, left_l1_dimensions, right_l1_dimensions))
         
         # ENHANCED: Identify additional L2 tables based on single connections to L1s
-        remaining_tables = [t for t in table_names if t not in categorized['fact_tables'] and 
-                           t not in categorized['calendar_tables'] and 
-                           t not in categorized['metrics_tables'] and 
-                           t not in categorized['parameter_tables'] and 
-                           t not in categorized['calculation_groups'] and 
-                           t not in categorized['disconnected_tables'] and 
-                           t not in calendar_connected_specials]
+        excluded_tables = calendar_special_set.union(
+            categorized['fact_tables'], categorized['calendar_tables'], categorized['metrics_tables'],
+            categorized['parameter_tables'], categorized['calculation_groups'], categorized['disconnected_tables'])
+        remaining_tables = [t for t in table_names if t not in excluded_tables]
         
         # Add existing L2s and identify additional ones
         all_l1_dimensions = left_l1_dimensions + right_l1_dimensions
@@ -144,8 +226,9 @@ class MiddleOutLayoutEngine:
         l2_dimensions.extend(additional_l2s)
         
         # Remove additional L2s from L1 lists
-        left_l1_dimensions = [t for t in left_l1_dimensions if t not in additional_l2s]
-        right_l1_dimensions = [t for t in right_l1_dimensions if t not in additional_l2s]
+        additional_l2_set = set(additional_l2s)
+        left_l1_dimensions = [t for t in left_l1_dimensions if t not in additional_l2_set]
+        right_l1_dimensions = [t for t in right_l1_dimensions if t not in additional_l2_set]
         
         # RELATIONSHIP-FIRST: Place L2 dimensions based on actual TMDL connections
         left_l2_dimensions, right_l2_dimensions = self.dimension_optimizer.place_l2_dimensions_near_l1(
@@ -159,103 +242,73 @@ class MiddleOutLayoutEngine:
         left_l4_dimensions, right_l4_dimensions = self.dimension_optimizer.place_l4_dimensions_near_l3(
             l4_plus_dimensions, left_l3_dimensions, right_l3_dimensions, left_l2_dimensions, right_l2_dimensions, connections)
             
+        # Every later phase reads and writes the dimension stacks through this one dict
+        stacks = {
+            'left_l4_dimensions': left_l4_dimensions,
+            'left_l3_dimensions': left_l3_dimensions,
+            'left_l2_dimensions': left_l2_dimensions,
+            'left_l1_dimensions': left_l1_dimensions,
+            'fact_tables': fact_tables,
+            'right_l1_dimensions': right_l1_dimensions,
+            'right_l2_dimensions': right_l2_dimensions,
+            'right_l3_dimensions': right_l3_dimensions,
+            'right_l4_dimensions': right_l4_dimensions
+        }
+        
         # Extension repositioning phase
         logger.info("Processing dimension extensions...")
         confirmed_extensions = categorized.get('dimension_extensions', {})
+        # Tuple/dict extension entries are normalized once for repositioning and family grouping
+        extension_pairs = self._extension_base_pairs(confirmed_extensions)
         if confirmed_extensions:
             try:
-                self._reposition_extensions(
-                    confirmed_extensions,
-                    left_l1_dimensions, right_l1_dimensions,
-                    left_l2_dimensions, right_l2_dimensions,
-                    left_l3_dimensions, right_l3_dimensions,
-                    left_l4_dimensions, right_l4_dimensions
-                )
+                buckets = {bucket: stacks[stack_key] for bucket, stack_key in _DIMENSION_BUCKETS}
+                self._reposition_extensions(extension_pairs, buckets)
                 logger.info(f"Repositioned {len(confirmed_extensions)} extension tables")
             except Exception as e:
                 logger.error(f"Error in extension repositioning: {e}")
         
         # ENHANCED: Apply opposite-side placement for 1:1 relationships
-        categorized_for_placement = {
-            'l1_dimension_left': left_l1_dimensions,
-            'l1_dimension_right': right_l1_dimensions,
-            'l2_dimension_left': left_l2_dimensions,
-            'l2_dimension_right': right_l2_dimensions,
-            'l3_dimension_left': left_l3_dimensions,
-            'l3_dimension_right': right_l3_dimensions,
-            'l4_plus_dimension_left': left_l4_dimensions,
-            'l4_plus_dimension_right': right_l4_dimensions
-        }
-        
+        categorized_for_placement = {placement_key: stacks[stack_key] for stack_key, placement_key in _PLACEMENT_KEYS}
         categorized_for_placement = self.dimension_optimizer.apply_opposite_side_placement(categorized_for_placement, connections)
         
-        # Update dimension lists after opposite-side placement
-        left_l1_dimensions = categorized_for_placement.get('l1_dimension_left', [])
-        right_l1_dimensions = categorized_for_placement.get('l1_dimension_right', [])
-        left_l2_dimensions = categorized_for_placement.get('l2_dimension_left', [])
-        right_l2_dimensions = categorized_for_placement.get('l2_dimension_right', [])
-        left_l3_dimensions = categorized_for_placement.get('l3_dimension_left', [])
-        right_l3_dimensions = categorized_for_placement.get('l3_dimension_right', [])
-        left_l4_dimensions = categorized_for_placement.get('l4_plus_dimension_left', [])
-        right_l4_dimensions = categorized_for_placement.get('l4_plus_dimension_right', [])
+        # Update dimension stacks after opposite-side placement
+        for stack_key, placement_key in _PLACEMENT_KEYS:
+            stacks[stack_key] = categorized_for_placement.get(placement_key, [])
         
         # Apply universal chain alignment optimization
         logger.info("Optimizing table alignment and positioning...")
-        all_dimension_stacks = {
-            'left_l4_dimensions': left_l4_dimensions,
-            'left_l3_dimensions': left_l3_dimensions,
-            'left_l2_dimensions': left_l2_dimensions,
-            'left_l1_dimensions': left_l1_dimensions,
-            'fact_tables': fact_tables,
-            'right_l1_dimensions': right_l1_dimensions,
-            'right_l2_dimensions': right_l2_dimensions,
-            'right_l3_dimensions': right_l3_dimensions,
-            'right_l4_dimensions': right_l4_dimensions
-        }
-        
-        # Apply universal chain alignment optimization
-        aligned_stacks = self.universal_chain_alignment.optimize_universal_stack_alignment(
-            all_dimension_stacks, connections)
+        stacks = self.universal_chain_alignment.optimize_universal_stack_alignment(stacks, connections)
         
         # Apply family-aware grouping for related tables
-        extensions = categorized.get('dimension_extensions', {})
-        if extensions:
+        if confirmed_extensions:
             try:
-                formatted_extensions = self._format_extensions_for_family_grouping(extensions)
-                aligned_stacks = enhance_alignment_with_family_grouping(aligned_stacks, formatted_extensions, connections)
-                logger.info(f"Applied family grouping for {len(extensions)} extension families")
+                formatted_extensions = self._format_extensions_for_family_grouping(extension_pairs)
+                stacks = enhance_alignment_with_family_grouping(stacks, formatted_extensions, connections)
+                logger.info(f"Applied family grouping for {len(confirmed_extensions)} extension families")
             except Exception as e:
                 logger.error(f"Error in family grouping: {e}")
         
         # Apply universal chain family grouping
-        aligned_stacks = self._apply_universal_chain_family_grouping(aligned_stacks, connections)
+        stacks = self._apply_universal_chain_family_grouping(stacks, connections)
         logger.info("Chain family grouping complete")
         
-        # Update dimension lists with optimized alignment
-        left_l4_dimensions = aligned_stacks.get('left_l4_dimensions', [])
-        left_l3_dimensions = aligned_stacks.get('left_l3_dimensions', [])
-        left_l2_dimensions = aligned_stacks.get('left_l2_dimensions', [])
-        left_l1_dimensions = aligned_stacks.get('left_l1_dimensions', [])
-        fact_tables = aligned_stacks.get('fact_tables', [])
-        right_l1_dimensions = aligned_stacks.get('right_l1_dimensions', [])
-        right_l2_dimensions = aligned_stacks.get('right_l2_dimensions', [])
-        right_l3_dimensions = aligned_stacks.get('right_l3_dimensions', [])
-        right_l4_dimensions = aligned_stacks.get('right_l4_dimensions', [])
-        
-        logger.info(f"Chain alignment optimization complete: processed {len(aligned_stacks)} table stacks")
-            
-        # Update categorized for dynamic positioning with SPLIT LISTS
-        categorized_with_splits = categorized.copy()
-        categorized_with_splits.update({
-            'l1_dimensions_left': left_l1_dimensions,
-            'l1_dimensions_right': right_l1_dimensions,
-            'l2_dimensions_left': left_l2_dimensions,
-            'l2_dimensions_right': right_l2_dimensions,
-            'l3_dimensions_left': left_l3_dimensions,
-            'l3_dimensions_right': right_l3_dimensions,
-            'l4_plus_dimensions_left': left_l4_dimensions,
-            'l4_plus_dimensions_right': right_l4_dimensions
-        })
+        fact_tables = stacks.get('fact_tables', [])
+        logger.info(f"Chain alignment optimization complete: processed {len(stacks)} table stacks")
+            
+        # Update categorized for dynamic positioning with SPLIT LISTS (read-only view, no copy)
+        # l2_dimensions is the working list that gained the additional L2s - column detection counts it
+        categorized_with_splits = ChainMap({
+            'l2_dimensions': l2_dimensions,
+            'l1_dimensions_left': stacks.get('left_l1_dimensions', []),
+            'l1_dimensions_right': stacks.get('right_l1_dimensions', []),
+            'l2_dimensions_left': stacks.get('left_l2_dimensions', []),
+            'l2_dimensions_right': stacks.get('right_l2_dimensions', []),
+            'l3_dimensions_left': stacks.get('left_l3_dimensions', []),
+            'l3_dimensions_right': stacks.get('right_l3_dimensions', []),
+            'l4_plus_dimensions_left': stacks.get('left_l4_dimensions', []),
+            'l4_plus_dimensions_right': stacks.get('right_l4_dimensions', [])
+        }, categorized)
         
         # Calculate X positions with SPLIT-AWARE spacing (using optimized aligned stacks)
         positions_map = self.position_calculator.calculate_canvas_positions(categorized_with_splits, canvas_width)
@@ -264,7 +317,7 @@ class MiddleOutLayoutEngine:
         logger.info("Generating optimized table positions...")
         
         positions = self.chain_aware_position_generator.generate_chain_aligned_positions(
-            aligned_stacks, positions_map, connections, calendar_connected_specials,
+            stacks, positions_map, connections, calendar_connected_specials,
             calendar_tables, metrics_tables, parameter_tables, disconnected_tables, calculation_groups
         )
         
@@ -273,141 +326,119 @@ class MiddleOutLayoutEngine:
         
         return positions
         
-    def _reposition_extensions(self, extensions: Dict[str, Any], 
-                              left_l1: List[str], right_l1: List[str],
-                              left_l2: List[str], right_l2: List[str],
-                              left_l3: List[str], right_l3: List[str],
-                              left_l4: List[str], right_l4: List[str]) -> None:
-        """🚀 NEW: Reposition extension tables one level further from facts than their base table"""
+    def _reposition_extensions(self, extension_pairs: List[Tuple[str, str]],
+                              buckets: Dict[Tuple[str, str], List[str]]) -> None:
+        """🚀 NEW: Reposition extension tables one level further from facts than their base table
+        
+        extension_pairs comes from _extension_base_pairs.
+        buckets maps (category, side), e.g. ('l2', 'left'), to that dimension list; lists are updated in place.
+        """
+        # table -> every (category, side) holding it, in bucket order and kept in step with the lists;
+        # placement can leave a table in more than one list, so each occurrence is tracked
+        table_location = {}
+        for bucket, dimension_list in buckets.items():
+            for table in dimension_list:
+                table_location.setdefault(table, []).append(bucket)
+        
+        # Hot pass: no per-extension try/except - the caller guards the whole repositioning
+        for extension_table, base_table in extension_pairs:
+            logger.info(f"Repositioning extension: {extension_table} (base: {base_table})")
+            
+            # Find base table's current category and side
+            base_category, base_side = self._find_table_category_and_side(base_table, table_location)
+            
+            if not base_category:
+                logger.warning(f"Base table {base_table} not found in any category")
+                continue
+                
+            # Calculate target category (one level further from facts)
+            target_category = self._calculate_target_category(base_category)
+            
+            if not target_category:
+                logger.warning(f"Could not calculate target category for base {base_category}")
+                continue
+            
+            # Remove extension from all current positions
+            self._remove_table_from_all_categories(extension_table, buckets, table_location)
+            
+            # Add to target category
+            self._add_table_to_category(extension_table, target_category, base_side, buckets, table_location)
+            
+            logger.info(f"Extension repositioned: {extension_table} moved from {base_category}_{base_side} → {target_category}_{base_side}")
+    
+    def _extension_base_pairs(self, extensions: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Validate extension entries once: (extension table, base table) for every 1:1 extension"""
+        pairs = []
         
         for extension_table, extension_info in extensions.items():
-            try:
-                # Handle both tuple and dict formats for backward compatibility
-                if isinstance(extension_info, tuple):
-                    base_table = extension_info[0] if len(extension_info) > 0 else None
-                    rel_type = extension_info[1] if len(extension_info) > 1 else 'extension'
-                elif isinstance(extension_info, dict):
-                    base_table = extension_info.get('base_table')
-                    rel_type = extension_info.get('type', 'extension')
-                else:
-                    logger.warning(f"Unknown extension_info format for {extension_table}: {type(extension_info)}")
-                    continue
-                
-                if rel_type != 'extension' or not base_table:
-                    continue
-                    
-                logger.info(f"Repositioning extension: {extension_table} (base: {base_table})")
-                
-                # Find base table's current category and side
-                base_category, base_side = self._find_table_category_and_side(
-                    base_table, left_l1, right_l1, left_l2, right_l2, left_l3, right_l3, left_l4, right_l4)
-                
-                if not base_category:
-                    logger.warning(f"Base table {base_table} not found in any category")
-                    continue
-                    
-                # Calculate target category (one level further from facts)
-                target_category = self._calculate_target_category(base_category)
-                
-                if not target_category:
-                    logger.warning(f"Could not calculate target category for base {base_category}")
-                    continue
-                
-                # Remove extension from all current positions
-                self._remove_table_from_all_categories(
-                    extension_table, left_l1, right_l1, left_l2, right_l2, left_l3, right_l3, left_l4, right_l4)
-                
-                # Add to target category
-                self._add_table_to_category(
-                    extension_table, target_category, base_side,
-                    left_l1, right_l1, left_l2, right_l2, left_l3, right_l3, left_l4, right_l4)
-                
-                logger.info(f"Extension repositioned: {extension_table} moved from {base_category}_{base_side} → {target_category}_{base_side}")
-                
-            except Exception as e:
-                logger.error(f"Error repositioning extension {extension_table}: {e}")
+            # Handle both tuple and dict formats for backward compatibility
+            if isinstance(extension_info, tuple):
+                base_table = extension_info[0] if len(extension_info) > 0 else None
+                rel_type = extension_info[1] if len(extension_info) > 1 else 'extension'
+            elif isinstance(extension_info, dict):
+                base_table = extension_info.get('base_table')
+                rel_type = extension_info.get('type', 'extension')
+            else:
+                logger.warning(f"Unknown extension_info format for {extension_table}: {type(extension_info)}")
                 continue
+            
+            if rel_type == 'extension' and base_table:
+                pairs.append((extension_table, base_table))
+        
+        return pairs
     
     def _find_table_category_and_side(self, table_name: str,
-                                     left_l1: List[str], right_l1: List[str],
-                                     left_l2: List[str], right_l2: List[str],
-                                     left_l3: List[str], right_l3: List[str],
-                                     left_l4: List[str], right_l4: List[str]) -> tuple:
+                                     table_location: Dict[str, List[Tuple[str, str]]]) -> tuple:
         """Find which category and side a table belongs to"""
         
-        if table_name in left_l1:
-            return 'l1', 'left'
-        elif table_name in right_l1:
-            return 'l1', 'right'
-        elif table_name in left_l2:
-            return 'l2', 'left'
-        elif table_name in right_l2:
-            return 'l2', 'right'
-        elif table_name in left_l3:
-            return 'l3', 'left'
-        elif table_name in right_l3:
-            return 'l3', 'right'
-        elif table_name in left_l4:
-            return 'l4', 'left'
-        elif table_name in right_l4:
-            return 'l4', 'right'
-        else:
-            return None, None
+        locations = table_location.get(table_name)
+        return locations[0] if locations else (None, None)
     
     def _calculate_target_category(self, base_category: str) -> str:
         """Calculate target category (one level further from facts)"""
-        
-        if base_category == 'l1':
-            return 'l2'
-        elif base_category == 'l2':
-            return 'l3'
-        elif base_category == 'l3':
-            return 'l4'
-        elif base_category == 'l4':
-            return 'l4'  # Already at maximum distance
-        else:
-            return None
+        return _NEXT_CATEGORY.get(base_category)
     
     def _remove_table_from_all_categories(self, table_name: str,
-                                         left_l1: List[str], right_l1: List[str],
-                                         left_l2: List[str], right_l2: List[str],
-                                         left_l3: List[str], right_l3: List[str],
-                                         left_l4: List[str], right_l4: List[str]) -> None:
+                                         buckets: Dict[Tuple[str, str], List[str]],
+                                         table_location: Dict[str, List[Tuple[str, str]]]) -> None:
         """Remove table from all dimension categories"""
         
-        for dimension_list in [left_l1, right_l1, left_l2, right_l2, left_l3, right_l3, left_l4, right_l4]:
-            if table_name in dimension_list:
-                dimension_list.remove(table_name)
+        locations = table_location.pop(table_name, None)
+        if not locations:
+            return
+        
+        # A table can sit in several lists: one list.remove per list holding it, like the scan over all eight
+        removed = set()
+        remaining = []
+        for bucket in locations:
+            if bucket in removed:
+                remaining.append(bucket)  # Repeated entry within one list: only the first is removed
+                continue
+            buckets[bucket].remove(table_name)
+            removed.add(bucket)
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Removed {table_name} from dimension list")
+        if remaining:
+            table_location[table_name] = remaining
     
     def _add_table_to_category(self, table_name: str, category: str, side: str,
-                              left_l1: List[str], right_l1: List[str],
-                              left_l2: List[str], right_l2: List[str],
-                              left_l3: List[str], right_l3: List[str],
-                              left_l4: List[str], right_l4: List[str]) -> None:
+                              buckets: Dict[Tuple[str, str], List[str]],
+                              table_location: Dict[str, List[Tuple[str, str]]]) -> None:
         """Add table to specified category and side"""
         
-        if category == 'l1' and side == 'left':
-            left_l1.append(table_name)
-        elif category == 'l1' and side == 'right':
-            right_l1.append(table_name)
-        elif category == 'l2' and side == 'left':
-            left_l2.append(table_name)
-        elif category == 'l2' and side == 'right':
-            right_l2.append(table_name)
-        elif category == 'l3' and side == 'left':
-            left_l3.append(table_name)
-        elif category == 'l3' and side == 'right':
-            right_l3.append(table_name)
-        elif category == 'l4' and side == 'left':
-            left_l4.append(table_name)
-        elif category == 'l4' and side == 'right':
-            right_l4.append(table_name)
-        else:
+        bucket = (category, side)
+        dimension_list = buckets.get(bucket)
+        if dimension_list is None:
             logger.warning(f"Unknown category/side combination: {category}_{side}")
             return
+        dimension_list.append(table_name)
+        locations = table_location.setdefault(table_name, [])
+        locations.append(bucket)
+        if len(locations) > 1:
+            locations.sort(key=_BUCKET_ORDER.__getitem__)
             
-        logger.debug(f"Added {table_name} to {category}_{side}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Added {table_name} to {category}_{side}")
         
     def _apply_universal_chain_family_grouping(self, aligned_stacks: Dict[str, List[str]], 
                                               connections: Dict[str, set]) -> Dict[str, List[str]]:
@@ -424,6 +455,9 @@ class MiddleOutLayoutEngine:
         
         logger.info(f"Found {len(chain_families)} chain families to group")
         
+        # Reverse lookup built once for every stack below
+        table_to_family = self._build_table_to_family(chain_families)
+        
         # Apply family grouping within each stack
         for stack_name, stack_tables in aligned_stacks.items():
             if not stack_tables:
@@ -432,7 +466,7 @@ class MiddleOutLayoutEngine:
             logger.info(f"Processing stack: {stack_name} with {len(stack_tables)} tables")
             
             # Group tables by their family membership
-            grouped_tables = self._group_tables_by_family(stack_tables, chain_families)
+            grouped_tables = self._group_tables_by_family(stack_tables, chain_families, table_to_family)
             
             # Reorganize stack to keep families together
             reorganized_stack = self._reorganize_stack_by_families(grouped_tables)
@@ -449,9 +483,29 @@ class MiddleOutLayoutEngine:
                                connections: Dict[str, set]) -> Dict[str, List[str]]:
         """Identify chain families based on naming patterns and relationships"""
         
-        all_tables = []
-        for stack_tables in aligned_stacks.values():
-            all_tables.extend(stack_tables)
+        all_tables = list(chain.from_iterable(aligned_stacks.values()))
+        
+        # A family needs two or more members
+        if len(all_tables) < 2:
+            return {}
+        
+        # First position of each table - family members keep stack order
+        position = {}
+        for index, table in enumerate(all_tables):
+            position.setdefault(table, index)
+        
+        # Base names computed once and bucketed, instead of once per candidate per table
+        bases = {table: self._extract_family_base_name(table) for table in position}
+        base_members = defaultdict(list)
+        for table, base in bases.items():
+            base_members[base].append(table)
+        
+        # Reverse edges: tables related to a table are its neighbours, the tables pointing at it,
+        # and the tables pointing at any of its neighbours (see _are_tables_in_same_family)
+        incoming = defaultdict(set)
+        for source_table, connected_tables in connections.items():
+            for connected_table in connected_tables:
+                incoming[connected_table].add(source_table)
         
         families = {}
         processed_tables = set()
@@ -461,24 +515,23 @@ class MiddleOutLayoutEngine:
                 continue
                 
             # Extract potential family base name
-            family_base = self._extract_family_base_name(table)
+            family_base = bases[table]
             
             if not family_base:
                 continue
                 
-            # Find all related tables with same family base
-            family_members = []
-            for candidate in all_tables:
-                if candidate in processed_tables:
-                    continue
-                    
-                candidate_base = self._extract_family_base_name(candidate)
-                
-                # Check if they share the same base name or are connected
-                if (candidate_base == family_base or 
-                    self._are_tables_in_same_family(table, candidate, connections)):
-                    family_members.append(candidate)
-                    processed_tables.add(candidate)
+            # Find all related tables with same family base or connected to this table
+            candidates = set(base_members[family_base])
+            if connections:
+                outgoing = connections.get(table, _EMPTY)
+                related = set(outgoing)
+                related.update(incoming.get(table, _EMPTY))
+                for connected_table in outgoing:
+                    related.update(incoming.get(connected_table, _EMPTY))
+                candidates.update(candidate for candidate in related if candidate in position)
+            family_members = sorted((candidate for candidate in candidates if candidate not in processed_tables),
+                                    key=position.__getitem__)
+            processed_tables.update(family_members)
             
             if len(family_members) > 1:  # Only consider actual families (2+ members)
                 families[family_base] = family_members
@@ -488,80 +541,55 @@ class MiddleOutLayoutEngine:
     
     def _extract_family_base_name(self, table_name: str) -> str:
         """Extract the base family name from a table name"""
-        
-        # Remove common prefixes
-        clean_name = table_name
-        prefixes = ['Dim_', 'Fact_', 'dim_', 'fact_']
-        for prefix in prefixes:
-            if clean_name.startswith(prefix):
-                clean_name = clean_name[len(prefix):]
-                break
-        
-        # Look for common base patterns
-        # Example: Property, PropertyAttributes, PropertyList -> Property
-        # Example: Tenant, TenantProgramType -> Tenant
-        
-        # Find the longest common prefix with other words
-        words = clean_name.split('_')
-        if len(words) > 1:
-            return words[0]  # First word is often the base
-        
-        # Check for camelCase patterns
-        import re
-        camel_parts = re.findall(r'[A-Z][a-z]*', clean_name)
-        if len(camel_parts) > 1:
-            return camel_parts[0]  # First camelCase part
-        
-        # For simple names, use the first part before any numbers or special suffixes
-        base_match = re.match(r'^([A-Za-z]+)', clean_name)
-        if base_match:
-            return base_match.group(1)
-        
-        return clean_name
+        return _family_base_name(table_name)
     
     def _are_tables_in_same_family(self, table1: str, table2: str, connections: Dict[str, set]) -> bool:
-        """Check if two tables belong to the same family based on relationships"""
-        
-        # Check direct connection
-        if table2 in connections.get(table1, set()) or table1 in connections.get(table2, set()):
-            return True
+        """Check if two tables belong to the same family based on relationships
         
-        # Check if they share connections to the same base table
-        table1_connections = connections.get(table1, set())
-        table2_connections = connections.get(table2, set())
+        Pairwise form of the rule _identify_chain_families applies in bulk.
+        """
+        table1_connections = connections.get(table1, _EMPTY)
+        table2_connections = connections.get(table2, _EMPTY)
         
-        # If they both connect to a common table, they might be family
-        common_connections = table1_connections.intersection(table2_connections)
-        if common_connections:
+        # Check direct connection
+        if table2 in table1_connections or table1 in table2_connections:
             return True
         
-        return False
+        # If they both connect to a common table, they might be family (stops at the first shared table)
+        return not table1_connections.isdisjoint(table2_connections)
+    
+    def _build_table_to_family(self, chain_families: Dict[str, List[str]]) -> Dict[str, str]:
+        """Map each table to the first chain family that lists it"""
+        table_to_family = {}
+        for family_name, family_members in chain_families.items():
+            for table in family_members:
+                table_to_family.setdefault(table, family_name)
+        return table_to_family
     
     def _group_tables_by_family(self, stack_tables: List[str], 
-                              chain_families: Dict[str, List[str]]) -> Dict[str, List[str]]:
+                              chain_families: Dict[str, List[str]],
+                              table_to_family: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
         """Group tables in a stack by their family membership"""
+        if table_to_family is None:
+            table_to_family = self._build_table_to_family(chain_families)
         
         grouped = {'unassigned': []}
         
         for table in stack_tables:
-            assigned = False
-            
             # Find which family this table belongs to
-            for family_name, family_members in chain_families.items():
-                if table in family_members:
-                    if family_name not in grouped:
-                        grouped[family_name] = []
-                    grouped[family_name].append(table)
-                    assigned = True
-                    break
-            
-            if not assigned:
+            family_name = table_to_family.get(table)
+            if family_name is None:
                 grouped['unassigned'].append(table)
+            else:
+                grouped.setdefault(family_name, []).append(table)
         
         return grouped
     
     def _reorganize_stack_by_families(self, grouped_tables: Dict[str, List[str]]) -> List[str]:
-        """Reorganize a stack to keep families together"""
+        """Reorganize a stack to keep families together
+        
+        The grouped lists are fresh per stack, so they are sorted in place rather than copied.
+        """
         
         reorganized = []
         
@@ -571,45 +599,26 @@ class MiddleOutLayoutEngine:
                 continue
             
             # Sort family members to ensure consistent ordering within family
-            sorted_family = sorted(family_tables)
-            reorganized.extend(sorted_family)
+            family_tables.sort()
+            reorganized.extend(family_tables)
             
-            logger.info(f"Grouped family '{family_name}' together: {sorted_family}")
+            logger.info(f"Grouped family '{family_name}' together: {family_tables}")
         
         # Then add unassigned tables
         if 'unassigned' in grouped_tables:
-            reorganized.extend(sorted(grouped_tables['unassigned']))
+            unassigned_tables = grouped_tables['unassigned']
+            unassigned_tables.sort()
+            reorganized.extend(unassigned_tables)
         
         return reorganized
         
-    def _format_extensions_for_family_grouping(self, extensions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
-        """Convert extension format to match family grouping expectations"""
-        
-        formatted = {}
+    def _format_extensions_for_family_grouping(self, extension_pairs: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """Convert normalized (extension, base) pairs to the format family grouping expects"""
         
-        for extension_table, extension_info in extensions.items():
-            try:
-                # Handle both tuple and dict formats
-                if isinstance(extension_info, tuple):
-                    base_table = extension_info[0] if len(extension_info) > 0 else None
-                    rel_type = extension_info[1] if len(extension_info) > 1 else 'extension'
-                elif isinstance(extension_info, dict):
-                    base_table = extension_info.get('base_table')
-                    rel_type = extension_info.get('type', 'extension')
-                else:
-                    logger.warning(f"Unknown extension format for {extension_table}: {type(extension_info)} - {extension_info}")
-                    continue
-                
-                if base_table and rel_type == 'extension':
-                    formatted[extension_table] = {
-                        'base_table': base_table,
-                        'type': rel_type
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Error formatting extension {extension_table}: {e}")
-                logger.error(f"Extension info: {extension_info}")
-                continue
+        formatted = {
+            extension_table: {'base_table': base_table, 'type': 'extension'}
+            for extension_table, base_table in extension_pairs
+        }
         
         logger.info(f"Formatted {len(formatted)} extensions for family grouping")
         return formatted
@@ -639,19 +648,20 @@ class MiddleOutLayoutEngine:
             current_layout = self.base_engine.parse_diagram_layout(str(self.pbip_folder))
             
             # Prepare nodes
-            enhanced_nodes = []
-            for pos in new_positions:
-                node = {
+            enhanced_nodes = [
+                {
                     'location': pos['location'],
                     'nodeIndex': pos['nodeIndex'],
                     'size': pos['size'],
                     'zIndex': pos['zIndex']
                 }
-                enhanced_nodes.append(node)
+                for pos in new_positions
+            ]
             
             # Create new layout data
             if current_layout and 'diagrams' in current_layout:
-                new_layout_data = current_layout.copy()
+                # Freshly parsed from disk and not shared - update it in place
+                new_layout_data = current_layout
                 if new_layout_data['diagrams']:
                     new_layout_data['diagrams'][0]['nodes'] = enhanced_nodes
                     new_layout_data['diagrams'][0]['hideKeyFieldsWhenCollapsed'] = False
@@ -681,10 +691,7 @@ class MiddleOutLayoutEngine:
                 saved = self.base_engine.save_diagram_layout(str(self.pbip_folder), new_layout_data)
             
             # Generate summary with updated categories
-            category_summary = {}
-            for pos in new_positions:
-                category = pos.get('category', 'unknown')
-                category_summary[category] = category_summary.get(category, 0) + 1
+            category_summary = dict(Counter(pos.get('category', 'unknown') for pos in new_positions))
             
             # Update category names to reflect L1-L2 adjacency improvements
             if 'l1_l2_dimension_left' in category_summary:
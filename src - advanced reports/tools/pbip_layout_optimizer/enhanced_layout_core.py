@@ -6,12 +6,63 @@ This enhanced version uses your migrated MCP components while maintaining
 compatibility with the existing tool architecture.
 """
 
-import json
+import copy
+import heapq
 import math
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import combinations, starmap
+from typing import Dict, List, Any, Set, Tuple, Optional
 from pathlib import Path
-from .base_layout_engine import BaseLayoutEngine
+from .base_layout_engine import BaseLayoutEngine, _APPLEDOUBLE_PREFIX
+
+# Advanced components are imported once; a failure is kept and reported when the core initializes
+try:
+    from .analyzers.table_categorizer import TableCategorizer
+    from .analyzers.relationship_analyzer import RelationshipAnalyzer
+    from .engines.middle_out_layout_engine import MiddleOutLayoutEngine
+    _ADVANCED_IMPORT_ERROR = None
+except Exception as e:
+    TableCategorizer = RelationshipAnalyzer = MiddleOutLayoutEngine = None
+    _ADVANCED_IMPORT_ERROR = e
+
+# PBIP semantic model folder suffix, compared case-normalized like glob does
+_SEMANTIC_MODEL_SUFFIX = os.path.normcase('.SemanticModel')
+
+# Most recently used folders whose validation results are kept
+_VALIDATION_CACHE_SIZE = 32
+
+# Most recently used folders whose analyzers are kept for reuse
+_COMPONENT_POOL_SIZE = 8
+
+# Most recently used folders whose categorization results are kept
+_CATEGORIZATION_CACHE_SIZE = 8
+
+# Quality rating: a score at or above each threshold earns the next label
+_RATING_THRESHOLDS = (20, 40, 60, 80)
+_RATING_LABELS = ("VERY POOR", "POOR", "FAIR", "GOOD", "EXCELLENT")
+
+# Spacing score: average spacing above each bound earns the next score
+_SPACING_BOUNDS = (200, 500, 1000)
+_SPACING_SCORES = (10, 25, 30, 20)
+
+# Category lists reported by analyze_table_categorization, in unpacking order
+_SUMMARY_CATEGORY_KEYS = (
+    'fact_tables', 'l1_dimensions', 'l2_dimensions', 'l3_dimensions', 'l4_plus_dimensions',
+    'calendar_tables', 'metrics_tables', 'parameter_tables', 'calculation_groups',
+    'disconnected_tables', 'auto_date_tables'
+)
+
+
+@dataclass
+class LayoutContext:
+    """Tables, relationship graph and categories discovered once for a single layout operation"""
+    table_names: Tuple[str, ...]
+    connections: Dict[str, Set[str]]
+    categories: Dict[str, Any]
 
 
 class EnhancedPBIPLayoutCore(BaseLayoutEngine):
@@ -27,9 +78,19 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             # For compatibility with old interface
             self.pbip_folder = None
             self.semantic_model_path = None
+            self.invalidate_cache()
             
         self.logger = logging.getLogger("enhanced_pbip_layout_optimizer")
         
+        # Successful folder validations: folder -> (folder/model/definition mtimes, result), LRU order
+        self._validation_cache: 'OrderedDict[str, Tuple[tuple, Dict[str, Any]]]' = OrderedDict()
+        
+        # Analyzer pairs per folder: folder -> (TMDL mtimes, RelationshipAnalyzer, TableCategorizer), LRU order
+        self._component_pool: 'OrderedDict[str, Tuple[tuple, Any, Any]]' = OrderedDict()
+        
+        # Categorization results per folder: folder -> (TMDL fingerprint, result, LayoutContext), LRU order
+        self._categorization_cache: 'OrderedDict[str, Tuple[tuple, Dict[str, Any], LayoutContext]]' = OrderedDict()
+        
         # Advanced integration components (will be initialized after files are moved)
         self.table_categorizer = None
         self.relationship_analyzer = None
@@ -45,13 +106,10 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             # Import advanced components from the migrated structure
             self.logger.info("🔍 Attempting to import advanced components...")
             
-            from .analyzers.table_categorizer import TableCategorizer
+            if _ADVANCED_IMPORT_ERROR is not None:
+                raise _ADVANCED_IMPORT_ERROR
             self.logger.info("✅ TableCategorizer imported successfully")
-            
-            from .analyzers.relationship_analyzer import RelationshipAnalyzer
             self.logger.info("✅ RelationshipAnalyzer imported successfully")
-            
-            from .engines.middle_out_layout_engine import MiddleOutLayoutEngine
             self.logger.info("✅ MiddleOutLayoutEngine imported successfully")
             
             # All components will be initialized per-operation with the specific PBIP folder
@@ -64,46 +122,85 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             self.logger.info("🎉 Advanced components successfully initialized - Middle-out design AVAILABLE!")
             
         except ImportError as e:
-            self.logger.warning(f"📦 Import error - Advanced components not available: {e}")
-            self.logger.warning(f"📁 Module path issue - Using basic layout functionality")
+            self.logger.warning("📦 Import error - Advanced components not available: %s", e)
+            self.logger.warning("📁 Module path issue - Using basic layout functionality")
             self.mcp_available = False
         except AttributeError as e:
-            self.logger.error(f"🔧 Attribute error in component initialization: {e}")
-            self.logger.error(f"📁 Component structure issue - Using basic layout functionality")
+            self.logger.error("🔧 Attribute error in component initialization: %s", e)
+            self.logger.error("📁 Component structure issue - Using basic layout functionality")
             self.mcp_available = False
         except Exception as e:
-            self.logger.error(f"❌ Unexpected error initializing advanced components: {e}")
-            self.logger.error(f"📁 Using basic layout functionality")
+            self.logger.error("❌ Unexpected error initializing advanced components: %s", e)
+            self.logger.error("📁 Using basic layout functionality")
             import traceback
-            self.logger.error(f"📋 Full traceback: {traceback.format_exc()}")
+            if self.logger.isEnabledFor(logging.ERROR):
+                self.logger.error("📋 Full traceback: %s", traceback.format_exc())
             self.mcp_available = False
     
     # =============================================================================
     # BRIDGE METHODS FOR TOOL COMPATIBILITY
     # =============================================================================
     
+    def _validation_signature(self, folder_path: Path, validation: Dict[str, Any]) -> Optional[tuple]:
+        """mtimes of the folders a valid result depends on (entries added/removed change them)"""
+        try:
+            return (folder_path.stat().st_mtime_ns,
+                    Path(validation['semantic_model_path']).stat().st_mtime_ns,
+                    Path(validation['definition_path']).stat().st_mtime_ns)
+        except OSError:
+            return None
+    
     def validate_pbip_folder(self, pbip_folder: str) -> Dict[str, Any]:
-        """Bridge method for tool compatibility"""
+        """Bridge method for tool compatibility
+        
+        Valid results are cached per folder until the PBIP, SemanticModel or definition folder changes.
+        The cache keeps the _VALIDATION_CACHE_SIZE most recently used folders.
+        """
+        cache_key = str(pbip_folder)
+        cached = self._validation_cache.get(cache_key)
+        if cached is not None:
+            signature, validation = cached
+            if signature == self._validation_signature(Path(pbip_folder), validation):
+                self._validation_cache.move_to_end(cache_key)
+                return dict(validation)
+            del self._validation_cache[cache_key]
+        
+        validation = self._validate_pbip_folder_uncached(pbip_folder)
+        if validation['valid']:
+            signature = self._validation_signature(Path(pbip_folder), validation)
+            if signature is not None:
+                self._validation_cache[cache_key] = (signature, validation)
+                if len(self._validation_cache) > _VALIDATION_CACHE_SIZE:
+                    self._validation_cache.popitem(last=False)
+        return dict(validation)
+    
+    def _validate_pbip_folder_uncached(self, pbip_folder: str) -> Dict[str, Any]:
+        """Probe the PBIP folder structure on disk"""
         try:
             folder_path = Path(pbip_folder)
             
-            if not folder_path.exists():
+            # One directory read answers exists / is-a-directory / first *.SemanticModel entry
+            try:
+                entries = os.scandir(folder_path)
+            except FileNotFoundError:
                 return {'valid': False, 'error': 'Folder does not exist'}
-            
-            if not folder_path.is_dir():
+            except NotADirectoryError:
                 return {'valid': False, 'error': 'Path is not a directory'}
             
-            # Look for .SemanticModel folder
-            semantic_folders = list(folder_path.glob("*.SemanticModel"))
+            # Look for .SemanticModel folder (glob("*.SemanticModel") matching, minus AppleDouble files like the TMDL scan)
+            with entries:
+                semantic_model_path = next(
+                    (Path(entry.path) for entry in entries
+                     if os.path.normcase(entry.name).endswith(_SEMANTIC_MODEL_SUFFIX)
+                     and not entry.name.startswith(_APPLEDOUBLE_PREFIX)),
+                    None)
             
-            if not semantic_folders:
+            if semantic_model_path is None:
                 return {
                     'valid': False,
                     'error': 'No .SemanticModel folder found. This tool requires PBIP format files.'
                 }
             
-            semantic_model_path = semantic_folders[0]
-            
             # Check for definition folder
             definition_path = semantic_model_path / "definition"
             if not definition_path.exists():
@@ -142,10 +239,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             # Find tables
             tables_path = definition_path / "tables"
             if tables_path.exists():
-                for table_file in tables_path.glob("*.tmdl"):
-                    table_name = table_file.stem
-                    normalized_name = self._normalize_table_name(table_name)
-                    tmdl_files[normalized_name] = table_file
+                tmdl_files.update(self._scan_table_tmdl_files(tables_path))
             
             # Find model.tmdl
             model_file = definition_path / "model.tmdl"
@@ -155,7 +249,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             return tmdl_files
             
         except Exception as e:
-            self.logger.error(f"Error finding TMDL files: {str(e)}")
+            self.logger.error("Error finding TMDL files: %s", e)
             return {}
     
     def get_table_names_from_tmdl(self, tmdl_files: Dict[str, Path]) -> List[str]:
@@ -175,13 +269,10 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             
             diagram_layout_path = Path(validation['diagram_layout_path'])
             
-            with open(diagram_layout_path, 'r', encoding='utf-8') as f:
-                layout_data = json.load(f)
-            
-            return layout_data
+            return self._read_layout_file(diagram_layout_path)
             
         except Exception as e:
-            self.logger.error(f"Error parsing diagram layout: {str(e)}")
+            self.logger.error("Error parsing diagram layout: %s", e)
             return None
     
     def save_diagram_layout(self, pbip_folder: str, layout_data: Dict[str, Any]) -> bool:
@@ -193,14 +284,13 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             
             diagram_layout_path = Path(validation['diagram_layout_path'])
             
-            with open(diagram_layout_path, 'w', encoding='utf-8') as f:
-                json.dump(layout_data, f, indent=2)
+            self._write_layout_file(diagram_layout_path, layout_data)
             
-            self.logger.info(f"Saved diagram layout to {diagram_layout_path}")
+            self.logger.info("Saved diagram layout to %s", diagram_layout_path)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error saving diagram layout: {str(e)}")
+            self.logger.error("Error saving diagram layout: %s", e)
             return False
     
     # =============================================================================
@@ -216,36 +306,85 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             # Update semantic model context first
             self._update_semantic_model_context(pbip_folder)
             
-            from .analyzers.table_categorizer import TableCategorizer
-            from .analyzers.relationship_analyzer import RelationshipAnalyzer
+            # Reuse this folder's analyzers (and their TMDL caches) while the model files are unchanged
+            pool_key = str(pbip_folder)
+            signature = self._component_signature()
+            pooled = self._component_pool.get(pool_key)
+            if pooled is not None and signature is not None and pooled[0] == signature:
+                self._component_pool.move_to_end(pool_key)
+                _, self.relationship_analyzer, self.table_categorizer = pooled
+                self.logger.info("♻️ Reusing advanced components for %s", pbip_folder)
+                return True
             
             # Initialize relationship analyzer
-            self.logger.info(f"🔧 Creating RelationshipAnalyzer for {pbip_folder}...")
+            self.logger.info("🔧 Creating RelationshipAnalyzer for %s...", pbip_folder)
             self.relationship_analyzer = RelationshipAnalyzer(self)
             
             # Initialize table categorizer with dependencies
-            self.logger.info(f"🔧 Creating TableCategorizer for {pbip_folder}...")
+            self.logger.info("🔧 Creating TableCategorizer for %s...", pbip_folder)
             self.table_categorizer = TableCategorizer(self, self.relationship_analyzer)
             
+            if signature is not None:
+                self._component_pool[pool_key] = (signature, self.relationship_analyzer, self.table_categorizer)
+                if len(self._component_pool) > _COMPONENT_POOL_SIZE:
+                    self._component_pool.popitem(last=False)
+            else:
+                self._component_pool.pop(pool_key, None)
+            
             self.logger.info("✅ Advanced components created successfully for this operation")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error creating advanced components: {e}")
+            self.logger.error("Error creating advanced components: %s", e)
             return False
     
-    def _create_middle_out_engine(self, pbip_folder: str):
+    def _component_signature(self) -> Optional[tuple]:
+        """mtimes of relationships.tmdl, the tables folder and its newest table file (None if unreadable)"""
+        if not self.semantic_model_path:
+            return None
+        definition_path = self.semantic_model_path / "definition"
+        tables_path = definition_path / "tables"
+        try:
+            with os.scandir(tables_path) as entries:
+                newest_table = max((entry.stat().st_mtime_ns for entry in entries if entry.name.endswith('.tmdl')),
+                                   default=0)
+            return (str(definition_path),
+                    (definition_path / "relationships.tmdl").stat().st_mtime_ns,
+                    tables_path.stat().st_mtime_ns,
+                    newest_table)
+        except OSError:
+            return None
+    
+    def _tmdl_fingerprint(self, tmdl_files: Dict[str, Path], definition_path: Path) -> Optional[tuple]:
+        """(path, mtime, size) of every TMDL file categorization reads, without reading them (None if unreadable)"""
+        paths = [str(path) for path in tmdl_files.values()]
+        relationships_file = definition_path / "relationships.tmdl"
+        if relationships_file.exists():
+            paths.append(str(relationships_file))
+        
+        fingerprint = []
+        try:
+            for path in sorted(paths):
+                stat_result = os.stat(path)
+                fingerprint.append((path, stat_result.st_mtime_ns, stat_result.st_size))
+        except OSError:
+            return None
+        return tuple(fingerprint)
+    
+    def _create_middle_out_engine(self, pbip_folder: str, context: Optional[LayoutContext] = None):
         """Create a middle-out engine instance for the specific PBIP folder"""
         try:
-            from .engines.middle_out_layout_engine import MiddleOutLayoutEngine
+            if MiddleOutLayoutEngine is None:
+                raise ImportError(f"MiddleOutLayoutEngine not available: {_ADVANCED_IMPORT_ERROR}")
             
             # Create the actual middle-out engine with our base engine as parameter
-            return MiddleOutLayoutEngine(pbip_folder, self)
+            return MiddleOutLayoutEngine(pbip_folder, self, context)
             
         except Exception as e:
-            self.logger.error(f"Error creating middle-out engine: {e}")
+            self.logger.error("Error creating middle-out engine: %s", e)
             import traceback
-            self.logger.error(f"Full traceback: {traceback.format_exc()}")
+            if self.logger.isEnabledFor(logging.ERROR):
+                self.logger.error("Full traceback: %s", traceback.format_exc())
             
             # Return a simplified adapter as fallback
             class SimpleMiddleOutAdapter:
@@ -292,6 +431,10 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
         Analyze and categorize tables using advanced components.
         Shows the categorization that will be used for layout optimization.
         """
+        return self._analyze_table_categorization(pbip_folder)[0]
+    
+    def _analyze_table_categorization(self, pbip_folder: str) -> Tuple[Dict[str, Any], Optional[LayoutContext]]:
+        """Categorization summary plus the LayoutContext it was built from (None on failure)"""
         try:
             # Validate PBIP folder first
             validation = self.validate_pbip_folder(pbip_folder)
@@ -300,7 +443,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                     'success': False,
                     'error': validation['error'],
                     'operation': 'analyze_table_categorization'
-                }
+                }, None
             
             # Check if advanced components are available
             if not self.mcp_available:
@@ -309,7 +452,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                     'error': 'Advanced components not available. Using basic layout functionality.',
                     'operation': 'analyze_table_categorization',
                     'mcp_status': self.get_mcp_status()
-                }
+                }, None
             
             # Create advanced components for this operation
             if not self._create_advanced_components(pbip_folder):
@@ -318,18 +461,31 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                     'error': 'Failed to create advanced components for this operation.',
                     'operation': 'analyze_table_categorization',
                     'mcp_status': self.get_mcp_status()
-                }
+                }, None
             
             # Get table names and relationships
             tmdl_files = self.find_tmdl_files(pbip_folder)
-            table_names = self.get_table_names_from_tmdl(tmdl_files)
+            
+            # Nothing the categorization reads has changed since the last run: reuse it
+            cache_key = str(pbip_folder)
+            fingerprint = self._tmdl_fingerprint(tmdl_files, Path(validation['definition_path']))
+            cached = self._categorization_cache.get(cache_key)
+            if cached is not None and fingerprint is not None and cached[0] == fingerprint:
+                self._categorization_cache.move_to_end(cache_key)
+                # Callers get their own copies - the cached lists must never be mutated in place
+                result, context = copy.deepcopy(cached[1:])
+                result['mcp_status'] = self.get_mcp_status()
+                return result, context
+            
+            # Immutable: the names are shared with the engine through the (cached) LayoutContext
+            table_names = tuple(self.get_table_names_from_tmdl(tmdl_files))
             
             if not table_names:
                 return {
                     'success': False,
                     'error': 'No tables found in TMDL files',
                     'operation': 'analyze_table_categorization'
-                }
+                }, None
             
             # Analyze relationships using advanced components
             connections = self.relationship_analyzer.build_relationship_graph()
@@ -342,42 +498,47 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             categorized_tables = sum(len(category_tables) for category_tables in categories.values() 
                                    if isinstance(category_tables, list))
             
-            # Create categorization summary
+            # Create categorization summary (each category list looked up once)
+            (fact_tables, l1_tables, l2_tables, l3_tables, l4_plus_tables, calendar_tables, metrics_tables,
+             parameter_tables, calculation_groups, disconnected_tables, auto_date_tables) = (
+                categories.get(key, []) for key in _SUMMARY_CATEGORY_KEYS)
             categorization_summary = {
                 'fact_tables': {
-                    'count': len(categories.get('fact_tables', [])),
-                    'tables': categories.get('fact_tables', [])
+                    'count': len(fact_tables),
+                    'tables': fact_tables
                 },
                 'dimension_tables': {
-                    'l1_count': len(categories.get('l1_dimensions', [])),
-                    'l2_count': len(categories.get('l2_dimensions', [])),
-                    'l3_count': len(categories.get('l3_dimensions', [])),
-                    'l4_plus_count': len(categories.get('l4_plus_dimensions', [])),
-                    'l1_tables': categories.get('l1_dimensions', []),
-                    'l2_tables': categories.get('l2_dimensions', []),
-                    'l3_tables': categories.get('l3_dimensions', []),
-                    'l4_plus_tables': categories.get('l4_plus_dimensions', [])
+                    'l1_count': len(l1_tables),
+                    'l2_count': len(l2_tables),
+                    'l3_count': len(l3_tables),
+                    'l4_plus_count': len(l4_plus_tables),
+                    'l1_tables': l1_tables,
+                    'l2_tables': l2_tables,
+                    'l3_tables': l3_tables,
+                    'l4_plus_tables': l4_plus_tables
                 },
                 'special_tables': {
-                    'calendar_count': len(categories.get('calendar_tables', [])),
-                    'metrics_count': len(categories.get('metrics_tables', [])),
-                    'parameter_count': len(categories.get('parameter_tables', [])),
-                    'calculation_groups_count': len(categories.get('calculation_groups', [])),
-                    'calendar_tables': categories.get('calendar_tables', []),
-                    'metrics_tables': categories.get('metrics_tables', []),
-                    'parameter_tables': categories.get('parameter_tables', []),
-                    'calculation_groups': categories.get('calculation_groups', [])
+                    'calendar_count': len(calendar_tables),
+                    'metrics_count': len(metrics_tables),
+                    'parameter_count': len(parameter_tables),
+                    'calculation_groups_count': len(calculation_groups),
+                    'calendar_tables': calendar_tables,
+                    'metrics_tables': metrics_tables,
+                    'parameter_tables': parameter_tables,
+                    'calculation_groups': calculation_groups
                 },
                 'disconnected_tables': {
-                    'count': len(categories.get('disconnected_tables', [])),
-                    'tables': categories.get('disconnected_tables', [])
+                    'count': len(disconnected_tables),
+                    'tables': disconnected_tables
                 },
                 'excluded_tables': {
-                    'auto_date_count': len(categories.get('auto_date_tables', [])),
-                    'auto_date_tables': categories.get('auto_date_tables', [])
+                    'auto_date_count': len(auto_date_tables),
+                    'auto_date_tables': auto_date_tables
                 }
             }
             
+            context = LayoutContext(table_names=table_names, connections=connections, categories=categories)
+            
             # Analyze extensions
             extensions = categories.get('dimension_extensions', {})
             extension_summary = []
@@ -395,7 +556,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                     'type': ext_type
                 })
             
-            return {
+            result = {
                 'success': True,
                 'operation': 'analyze_table_categorization',
                 'pbip_folder': str(Path(pbip_folder)),
@@ -408,18 +569,24 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                 },
                 'categorization': categorization_summary,
                 'extensions': extension_summary,
-                'relationship_connections': dict(connections),  # Convert sets to lists for JSON serialization
+                'relationship_connections': {table: list(connected) for table, connected in connections.items()},  # Sets to lists for JSON serialization
                 'layout_ready': True
             }
             
+            if fingerprint is not None:
+                self._categorization_cache[cache_key] = (fingerprint,) + copy.deepcopy((result, context))
+                if len(self._categorization_cache) > _CATEGORIZATION_CACHE_SIZE:
+                    self._categorization_cache.popitem(last=False)
+            return result, context
+            
         except Exception as e:
-            self.logger.error(f"Error analyzing table categorization: {str(e)}")
+            self.logger.error("Error analyzing table categorization: %s", e)
             return {
                 'success': False,
                 'error': str(e),
                 'operation': 'analyze_table_categorization',
                 'mcp_status': self.get_mcp_status()
-            }
+            }, None
     
     def optimize_layout_with_advanced(self, pbip_folder: str, canvas_width: int = 1400, canvas_height: int = 900, 
                                     save_changes: bool = True, use_middle_out: bool = True) -> Dict[str, Any]:
@@ -427,8 +594,8 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
         Optimize layout using advanced middle-out engine with enhanced categorization.
         """
         try:
-            # First, analyze table categorization
-            categorization_result = self.analyze_table_categorization(pbip_folder)
+            # First, analyze table categorization (the engine reuses its tables, graph and categories)
+            categorization_result, context = self._analyze_table_categorization(pbip_folder)
             if not categorization_result['success']:
                 return categorization_result
             
@@ -439,7 +606,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                 return self.optimize_layout(pbip_folder, canvas_width, canvas_height, save_changes, False)
             
             # Create middle-out engine for this operation
-            middle_out_engine = self._create_middle_out_engine(pbip_folder)
+            middle_out_engine = self._create_middle_out_engine(pbip_folder, context)
             if not middle_out_engine:
                 self.logger.warning("Could not create middle-out engine, falling back to basic layout")
                 return self.optimize_layout(pbip_folder, canvas_width, canvas_height, save_changes, False)
@@ -467,7 +634,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             return layout_result
             
         except Exception as e:
-            self.logger.error(f"Error optimizing layout with advanced components: {str(e)}")
+            self.logger.error("Error optimizing layout with advanced components: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -498,15 +665,6 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                     'operation': 'optimize_layout'
                 }
             
-            # Get current layout
-            layout_data = self.parse_diagram_layout(pbip_folder)
-            if not layout_data:
-                return {
-                    'success': False,
-                    'error': 'Could not parse diagram layout',
-                    'operation': 'optimize_layout'
-                }
-            
             # Get table names
             tmdl_files = self.find_tmdl_files(pbip_folder)
             table_names = self.get_table_names_from_tmdl(tmdl_files)
@@ -521,13 +679,21 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             # Generate basic grid positions
             new_positions = self._generate_grid_positions(table_names, canvas_width, canvas_height)
             
-            # Update layout data
-            if 'diagrams' in layout_data and layout_data['diagrams']:
-                layout_data['diagrams'][0]['nodes'] = new_positions
-            
-            # Save if requested
+            # Save if requested - the current layout is only read when it will be written back
             saved = False
             if save_changes:
+                layout_data = self.parse_diagram_layout(pbip_folder)
+                if not layout_data:
+                    return {
+                        'success': False,
+                        'error': 'Could not parse diagram layout',
+                        'operation': 'optimize_layout'
+                    }
+                
+                # Update layout data, keeping the other diagrams and view settings
+                if 'diagrams' in layout_data and layout_data['diagrams']:
+                    layout_data['diagrams'][0]['nodes'] = new_positions
+                
                 saved = self.save_diagram_layout(pbip_folder, layout_data)
             
             return {
@@ -542,7 +708,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             }
             
         except Exception as e:
-            self.logger.error(f"Error optimizing layout: {str(e)}")
+            self.logger.error("Error optimizing layout: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -551,8 +717,6 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
     
     def _generate_grid_positions(self, table_names: List[str], canvas_width: int, canvas_height: int) -> List[Dict[str, Any]]:
         """Generate basic grid positions for tables"""
-        positions = []
-        
         table_width = 200
         table_height = 104
         spacing = 50
@@ -560,23 +724,19 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
         
         # Calculate grid dimensions
         tables_per_row = max(1, (canvas_width - 2 * margin) // (table_width + spacing))
-        rows_needed = math.ceil(len(table_names) / tables_per_row)
+        column_step = table_width + spacing
+        row_step = table_height + spacing
         
-        for i, table_name in enumerate(table_names):
-            row = i // tables_per_row
-            col = i % tables_per_row
-            
-            x = margin + col * (table_width + spacing)
-            y = margin + row * (table_height + spacing)
-            
-            positions.append({
+        return [
+            {
                 'nodeIndex': table_name,
-                'location': {'x': x, 'y': y},
+                'location': {'x': margin + (i % tables_per_row) * column_step,
+                             'y': margin + (i // tables_per_row) * row_step},
                 'size': {'width': table_width, 'height': table_height},
                 'zIndex': i
-            })
-        
-        return positions
+            }
+            for i, table_name in enumerate(table_names)
+        ]
     
     def analyze_layout_quality(self, pbip_folder: str) -> Dict[str, Any]:
         """Analyze the current layout quality"""
@@ -626,7 +786,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             }
             
         except Exception as e:
-            self.logger.error(f"Error analyzing layout quality: {str(e)}")
+            self.logger.error("Error analyzing layout quality: %s", e)
             return {
                 'success': False,
                 'error': str(e),
@@ -656,27 +816,24 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             
             # Calculate overlaps and spacing
             positions = []
+            rects = []
             for node in nodes:
                 if 'location' in node:
                     x = node['location'].get('x', 0)
                     y = node['location'].get('y', 0)
                     positions.append((x, y))
+                    size = node.get('size', {})
+                    rects.append((x, y, x + size.get('width', 0), y + size.get('height', 0)))
+                    if x < 0 or y < 0:
+                        analysis['tables_outside_canvas'] += 1
+            
+            analysis['overlapping_tables'] = self._count_overlapping_tables(rects)
             
             if len(positions) > 1:
-                # Calculate average spacing
-                total_distance = 0
-                count = 0
-                
-                for i in range(len(positions)):
-                    for j in range(i + 1, len(positions)):
-                        x1, y1 = positions[i]
-                        x2, y2 = positions[j]
-                        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-                        total_distance += distance
-                        count += 1
-                
-                if count > 0:
-                    analysis['average_spacing'] = round(total_distance / count, 1)
+                # Calculate average spacing over every pair (math.dist keeps the pair loop in C)
+                total_distance = sum(starmap(math.dist, combinations(positions, 2)))
+                count = len(positions) * (len(positions) - 1) // 2
+                analysis['average_spacing'] = round(total_distance / count, 1)
             
             # Calculate layout efficiency (simplified)
             if analysis['total_tables'] > 0:
@@ -686,10 +843,30 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
                 analysis['layout_efficiency'] = max(0, round(efficiency, 1))
             
         except Exception as e:
-            self.logger.error(f"Error analyzing positions: {str(e)}")
+            self.logger.error("Error analyzing positions: %s", e)
         
         return analysis
     
+    def _count_overlapping_tables(self, rects: List[Tuple[float, float, float, float]]) -> int:
+        """Count tables whose (left, top, right, bottom) box overlaps another one (sweep over x)"""
+        rects = sorted(rects)
+        active = []  # (right, index) of boxes still spanning the sweep position
+        overlapping = set()
+        
+        for index, (left, top, right, bottom) in enumerate(rects):
+            while active and active[0][0] <= left:
+                heapq.heappop(active)
+            
+            for _, other in active:
+                other_top, other_bottom = rects[other][1], rects[other][3]
+                if top < other_bottom and other_top < bottom:
+                    overlapping.add(index)
+                    overlapping.add(other)
+            
+            heapq.heappush(active, (right, index))
+        
+        return len(overlapping)
+    
     def _calculate_quality_score(self, analysis: Dict[str, Any]) -> float:
         """Calculate overall quality score"""
         score = 0
@@ -703,16 +880,8 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
             overlap_penalty = (analysis['overlapping_tables'] / analysis['total_tables']) * 30
             score -= overlap_penalty
         
-        # Spacing score
-        spacing = analysis['average_spacing']
-        if spacing > 1000:  # Too spread out
-            score += 20
-        elif spacing > 500:  # Good spacing
-            score += 30
-        elif spacing > 200:  # Acceptable
-            score += 25
-        else:  # Too cramped
-            score += 10
+        # Spacing score: too cramped, acceptable, good, too spread out
+        score += _SPACING_SCORES[bisect_left(_SPACING_BOUNDS, analysis['average_spacing'])]
         
         # Efficiency bonus
         score += analysis['layout_efficiency'] * 0.1
@@ -721,16 +890,7 @@ class EnhancedPBIPLayoutCore(BaseLayoutEngine):
     
     def _get_quality_rating(self, score: float) -> str:
         """Get quality rating from score"""
-        if score >= 80:
-            return "EXCELLENT"
-        elif score >= 60:
-            return "GOOD"
-        elif score >= 40:
-            return "FAIR"
-        elif score >= 20:
-            return "POOR"
-        else:
-            return "VERY POOR"
+        return _RATING_LABELS[bisect_right(_RATING_THRESHOLDS, score)]
     
     def _generate_recommendations(self, analysis: Dict[str, Any]) -> List[str]:
         """Generate layout improvement recommendations"""
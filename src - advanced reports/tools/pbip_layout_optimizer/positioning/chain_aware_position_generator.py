@@ -5,6 +5,7 @@ Generates positions that directly honor Universal Chain Alignment optimization
 """
 
 import logging
+from operator import itemgetter
 from typing import Dict, List, Tuple, Set, Any, Optional
 
 logger = logging.getLogger("pbip-tools-mcp")
@@ -115,7 +116,7 @@ class ChainAwarePositionGenerator:
                 logger.debug(f"Non-reserved: {table} → will use gap filling")
         
         # Sort reserved tables by their locked position
-        reserved_tables.sort(key=lambda x: x[1])
+        reserved_tables.sort(key=itemgetter(1))
         
         # Position reserved tables at their EXACT locked positions (with proper spacing)
         for table, locked_position in reserved_tables:
@@ -5,10 +5,16 @@ Optimizes dimension table placement and grouping
 """
 
 import logging
+import re
+from operator import itemgetter
 from typing import Dict, List, Tuple, Set
 
 logger = logging.getLogger("pbip-tools-mcp")
 
+# Real estate L1/L2 keywords, each checked in one regex pass per table name
+_PROPERTY_L1_RE = re.compile('property|building|asset|site|tenant')
+_PORTFOLIO_L2_RE = re.compile('portfolio|unit|propertyunit|tenant')
+
 
 class DimensionOptimizer:
     """Optimizes dimension table placement and grouping"""
@@ -61,8 +67,9 @@ class DimensionOptimizer:
         
     def _detect_naming_hierarchy(self, table1: str, table2: str) -> bool:
         """Detect parent-child relationships based on naming patterns"""
-        name1_lower = table1.lower()
-        name2_lower = table2.lower()
+        # Lowercased names come from the categorizer's per-table cache (called per table pair)
+        name1_lower = self.table_categorizer.lower_name(table1)
+        name2_lower = self.table_categorizer.lower_name(table2)
         
         # Pattern 1: Base name + Tree/Detail/Category patterns
         hierarchical_suffixes = ['tree', 'detail', 'category', 'attribute', 'extended', 'child']
@@ -76,8 +83,8 @@ class DimensionOptimizer:
         
     def _detect_business_hierarchy(self, table1: str, table2: str) -> bool:
         """Detect business domain hierarchies (Property > Unit, Account > AccountCategory, etc.)"""
-        name1_lower = table1.lower()
-        name2_lower = table2.lower()
+        name1_lower = self.table_categorizer.lower_name(table1)
+        name2_lower = self.table_categorizer.lower_name(table2)
         
         # Known business hierarchies
         business_hierarchies = [
@@ -153,7 +160,7 @@ class DimensionOptimizer:
             for table2 in connected_tables:
                 if table2 in table_list and table1 != table2:
                     # Avoid duplicates by ordering the pair
-                    pair = tuple(sorted([table1, table2]))
+                    pair = (table1, table2) if table1 <= table2 else (table2, table1)
                     if pair not in pairs:
                         pairs.append(pair)
                         logger.info(f"GENERAL CONNECTED PAIR: '{pair[0]}' <-> '{pair[1]}'")
@@ -173,7 +180,7 @@ class DimensionOptimizer:
             for table2 in connected_tables:
                 if table2 in table_list and table2 != table1:
                     # Create sorted pair to avoid duplicates
-                    pair = tuple(sorted([table1, table2]))
+                    pair = (table1, table2) if table1 <= table2 else (table2, table1)
                     if pair not in pairs:
                         pairs.append(pair)
                         processed.add(table1)
@@ -618,7 +625,7 @@ class DimensionOptimizer:
             logger.info(f"L3+ table '{table}': {score} connections to target tables → {list(connected_targets)}")
         
         # Sort by connection score (tables with more connections to targets go first)
-        table_scores.sort(key=lambda x: x[1], reverse=True)
+        table_scores.sort(key=itemgetter(1), reverse=True)
         
         optimized_order = [table for table, score, connections in table_scores]
         logger.info(f"UNIVERSAL optimized order: {optimized_order}")
@@ -669,18 +676,18 @@ class DimensionOptimizer:
         # Find property-related L1 tables
         property_l1_tables = []
         for l1_table in l1_dimensions:
-            l1_lower = l1_table.lower()
-            if any(keyword in l1_lower for keyword in ['property', 'building', 'asset', 'site', 'tenant']):
+            l1_lower = self.table_categorizer.lower_name(l1_table)
+            if _PROPERTY_L1_RE.search(l1_lower):
                 property_l1_tables.append(l1_table)
                 logger.info(f"PROPERTY L1 DETECTED: '{l1_table}'")
         
         # Find portfolio/unit-related L2 tables that connect to property L1s
         for l2_table in l2_dimensions:
-            l2_lower = l2_table.lower()
+            l2_lower = self.table_categorizer.lower_name(l2_table)
             l2_connections = connections.get(l2_table, set())
             
             # Check if this L2 is portfolio/unit/tenant related and connects to a property L1
-            if any(keyword in l2_lower for keyword in ['portfolio', 'unit', 'propertyunit', 'tenant']):
+            if _PORTFOLIO_L2_RE.search(l2_lower):
                 # Find which property L1 it connects to
                 connected_property_l1s = [p for p in property_l1_tables if p in l2_connections]
                 
@@ -989,11 +996,11 @@ class DimensionOptimizer:
         misplacements = []
         
         all_l3 = left_l3 + right_l3
-        all_l2 = left_l2 + right_l2
+        all_l2 = set(left_l2).union(right_l2)  # Built once, intersected per L3 table
         
         for l3_table in all_l3:
             l3_connections = connections.get(l3_table, set())
-            connected_l2s = l3_connections.intersection(set(all_l2))
+            connected_l2s = l3_connections.intersection(all_l2)
             
             if connected_l2s:
                 # Find primary L2 connection
@@ -1021,14 +1028,14 @@ class DimensionOptimizer:
         misplacements = []
         
         all_l4 = left_l4 + right_l4
-        all_l3 = left_l3 + right_l3
-        all_l2 = left_l2 + right_l2
+        all_l3 = set(left_l3).union(right_l3)  # Built once, intersected per L4 table
+        all_l2 = set(left_l2).union(right_l2)
         
         for l4_table in all_l4:
             l4_connections = connections.get(l4_table, set())
             
             # Check L3 connections first (priority)
-            connected_l3s = l4_connections.intersection(set(all_l3))
+            connected_l3s = l4_connections.intersection(all_l3)
             
             if connected_l3s:
                 primary_l3 = self._get_primary_connection(connected_l3s, connections)
@@ -1044,7 +1051,7 @@ class DimensionOptimizer:
                 continue
             
             # Fallback to L2 connections if no L3 connections
-            connected_l2s = l4_connections.intersection(set(all_l2))
+            connected_l2s = l4_connections.intersection(all_l2)
             
             if connected_l2s:
                 primary_l2 = self._get_primary_connection(connected_l2s, connections)
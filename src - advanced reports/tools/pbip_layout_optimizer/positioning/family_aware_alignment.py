@@ -127,7 +127,7 @@ class FamilyAwareAlignment:
         
         # Phase 4: Build final organized list
         # First, add families in order
-        for family_name in sorted(family_order.keys(), key=lambda f: family_order[f]):
+        for family_name in sorted(family_order, key=family_order.__getitem__):
             family_tables = families_in_stack[family_name]
             
             # Within each family, sort to put base table first, then extensions
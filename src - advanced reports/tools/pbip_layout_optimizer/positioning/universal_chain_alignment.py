@@ -5,6 +5,7 @@ Group complete relationship chains into families and align entire families acros
 """
 
 import logging
+from operator import itemgetter
 from typing import Dict, List, Tuple, Set, Any, Optional
 from collections import defaultdict
 
@@ -226,7 +227,7 @@ class UniversalChainAlignment:
                 logger.info(f"      📋 {table} → Unassigned (position {len(chain_families) + len(stack_organization)})")
             
             # Sort by position and extract table names
-            stack_organization.sort(key=lambda x: x['position'])
+            stack_organization.sort(key=itemgetter('position'))
             aligned_stacks[stack_name] = [item['table'] for item in stack_organization]
             
             logger.info(f"   Stack {stack_name}: {len(original_tables)} → {len(aligned_stacks[stack_name])} tables")